@@ -0,0 +1,77 @@
+"""
+Tests for the ETL chunk formatters: the batch (vectorized) formatters must
+accept, skip and format records exactly like the per-record ones
+"""
+
+import os
+import unittest
+
+try:
+    os.makedirs('logs', exist_ok=True)  # the ETL module logs to logs/ on import
+    from trade_intel_etl_rag import TextChunkFormatter
+except ImportError as e:
+    raise unittest.SkipTest(f"ETL dependencies not installed: {str(e)}")
+
+COMTRADE_RECORDS = [
+    {'period': '202401', 'reporterDesc': 'Germany', 'partnerDesc': 'China', 'cmdCode': '851712',
+     'cmdDesc': 'Telephones', 'primaryValue': 1234567.6, 'qty': 1500, 'qtyUnitAbbr': 'u', 'flowDesc': 'Import'},
+    {'period': 202402, 'reporterDesc': 'France', 'primaryValue': 10, 'qty': 2},       # int period
+    {'period': '2023', 'reporterDesc': 'Spain', 'primaryValue': 99.5, 'qty': 0},      # annual data
+    {'reporterDesc': 'Italy', 'primaryValue': 5, 'qty': 1},                           # missing period
+    {'period': '202403', 'primaryValue': '2500.25', 'qty': '7'},                      # numeric strings
+    {'period': '202404', 'primaryValue': 100, 'qty': 'n/a'},                          # non-numeric qty
+    {'period': '202413', 'primaryValue': 100, 'qty': 1},                              # no month 13
+    {'period': '202405', 'reporterDesc': None, 'primaryValue': None, 'qty': 3},       # nulls take defaults
+    {'period': '202406', 'primaryValue': float('nan'), 'qty': 1},                     # non-finite value
+    {'period': '202407', 'flowDesc': 2, 'cmdCode': 851712, 'primaryValue': 1, 'qty': 1},
+]
+
+BL_RECORDS = [
+    {'shipment_date': '2024-01-05', 'buyer': 'Acme', 'supplier': 'Widgets Ltd', 'hs_code': '950300',
+     'product_description': 'Toys', 'quantity': 100, 'weight_kg': 250.5, 'origin_country': 'China',
+     'destination_country': 'USA', 'port_of_loading': 'Shanghai', 'port_of_discharge': 'Los Angeles'},
+    {'date': '2024-01-06', 'consignee': 'Beta', 'shipper': 'Gamma', 'qty': '12', 'weight': '3.5'},   # aliases
+    {'shipment_date': None, 'date': '2024-01-07', 'buyer': 'Delta', 'quantity': 1},                  # null canonical
+    {'shipment_date': '2024-01-08', 'quantity': '12 pcs'},                                           # non-numeric
+    {'shipment_date': '2024-01-09', 'weight_kg': float('inf')},                                      # non-finite
+    {'hs_code': 851712},
+]
+
+def per_record(format_record, records):
+    chunks = [format_record(record) for record in records]
+    return [(text, metadata) for text, metadata in chunks if text and metadata]
+
+class FormatterEquivalenceTest(unittest.TestCase):
+
+    def test_comtrade_batch_matches_per_record(self):
+        expected = per_record(TextChunkFormatter.format_comtrade_record, COMTRADE_RECORDS)
+        self.assertEqual(TextChunkFormatter.format_comtrade_records(COMTRADE_RECORDS), expected)
+        self.assertEqual(len(expected), 6)
+
+    def test_comtrade_rows_do_not_depend_on_neighbours(self):
+        for record in COMTRADE_RECORDS:
+            self.assertEqual(
+                TextChunkFormatter.format_comtrade_records([record]),
+                per_record(TextChunkFormatter.format_comtrade_record, [record])
+            )
+
+    def test_comtrade_dates(self):
+        dates = [metadata['date'] for _, metadata in
+                 TextChunkFormatter.format_comtrade_records(COMTRADE_RECORDS)]
+        self.assertEqual(dates, ['2024-01-01', '2024-02-01', '2023-01-01',
+                                 '2024-03-01', '2024-05-01', '2024-07-01'])
+
+    def test_bl_batch_matches_per_record(self):
+        expected = per_record(TextChunkFormatter.format_bl_record, BL_RECORDS)
+        self.assertEqual(TextChunkFormatter.format_bl_records(BL_RECORDS), expected)
+        self.assertEqual(len(expected), 4)
+
+    def test_bl_rows_do_not_depend_on_neighbours(self):
+        for record in BL_RECORDS:
+            self.assertEqual(
+                TextChunkFormatter.format_bl_records([record]),
+                per_record(TextChunkFormatter.format_bl_record, [record])
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Shared helpers for the Trade Intelligence RAG components
+Kept free of LLM/vector-DB imports so any component can use them cheaply
+"""
+
+import os
+import functools
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+import configparser
+
+@functools.lru_cache(maxsize=4)
+def _parse_config(path: str, mtime_ns: Optional[int]) -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read(path)
+    return config
+
+def load_config(path: str) -> configparser.ConfigParser:
+    """
+    Parsed configuration file, re-read only when its modification time changes
+    
+    The parser is shared between callers, so treat it as read-only.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:  # Missing file parses as empty, like ConfigParser.read
+        mtime_ns = None
+    return _parse_config(path, mtime_ns)
+
+class TextStore:
+    """
+    Local SQLite side store for chunk text, keyed by vector id
+    
+    Written by the ETL when store_text_in_metadata = false and read back by the
+    RAG query engine, so both must run against the same text_store_path.
+    """
+    
+    # Keep well under SQLite's bound-parameter limit per lookup
+    _LOOKUP_CHUNK = 500
+    
+    def __init__(self, db_path: str = 'data/text_store.db'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # Upserts run on a background thread, so share one guarded connection
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS texts (id TEXT PRIMARY KEY, text TEXT NOT NULL)')
+            self.conn.commit()
+    
+    def put_many(self, items: List[Tuple[str, str]]):
+        """Store (vector_id, text) pairs"""
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO texts (id, text) VALUES (?, ?)', items)
+            self.conn.commit()
+    
+    def get_many(self, ids: List[str]) -> Dict[str, str]:
+        """Return stored text for the ids that are present"""
+        found = {}
+        with self.lock:
+            for i in range(0, len(ids), self._LOOKUP_CHUNK):
+                chunk = ids[i:i + self._LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(f'SELECT id, text FROM texts WHERE id IN ({placeholders})', chunk)
+                found.update(rows)
+        return found
@@ -5,10 +5,23 @@ and stores them in a vector database for RAG retrieval.
 """
 
 import os
-import json
+import asyncio
+import functools
+import gzip
 import logging
+import hashlib
+import math
+import re
+import operator
+import itertools
+import sqlite3
+import socket
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 import configparser
 from pathlib import Path
 import glob
@@ -17,9 +30,16 @@ import glob
 from pinecone import Pinecone, ServerlessSpec
 # Alternative: from weaviate import Client as WeaviateClient
 
-# Embedding models
+import ijson
+import numpy as np
+import pandas as pd
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# Embedding models (tiktoken, fastembed and sentence-transformers are imported
+# by the provider that needs them)
 import openai
-from sentence_transformers import SentenceTransformer
+
+from trade_intel_common import TextStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,9 +51,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class EmbeddingCache:
+    """Persistent embedding cache keyed on sha256(model + text), backed by SQLite"""
+    
+    # Keep well under SQLite's bound-parameter limit per lookup
+    _LOOKUP_CHUNK = 500
+    
+    def __init__(self, db_path: str = 'data/embed_cache.db'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)'
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(model_id: str, text: str) -> bytes:
+        """Stable cache key for a text embedded by a given model"""
+        return hashlib.sha256((model_id + '\0' + text).encode('utf-8')).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Return cached embeddings for the keys that are present"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), self._LOOKUP_CHUNK):
+            chunk = unique_keys[i:i + self._LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk
+            )
+            for key, blob in rows:
+                # Stored as float16 to halve the cache size
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+        return found
+    
+    def put_many(self, items: List[Tuple[bytes, List[float]]]):
+        """Store (key, embedding) pairs"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+            [(key, np.asarray(emb, dtype=np.float16).tobytes()) for key, emb in items]
+        )
+        self.conn.commit()
+
 class EmbeddingGenerator:
     """Generates embeddings using OpenAI or local models"""
     
+    # OpenAI per-input token limit for embedding models
+    MAX_INPUT_TOKENS = 8191
+    
     def __init__(self, config: configparser.ConfigParser):
         self.provider = config.get('EMBEDDINGS', 'provider', fallback='openai')
         
@@ -41,14 +106,55 @@ class EmbeddingGenerator:
             self.api_key = config.get('EMBEDDINGS', 'openai_api_key')
             openai.api_key = self.api_key
             self.model = config.get('EMBEDDINGS', 'openai_model', fallback='text-embedding-3-small')
+            self.model_id = self.model
             self.dimension = 1536  # Default for text-embedding-3-small
+            # OpenAI accepts up to 2048 inputs per embeddings request
+            self.batch_size = config.getint('EMBEDDINGS', 'openai_batch_size', fallback=1000)
+            self.max_concurrency = config.getint('EMBEDDINGS', 'max_concurrency', fallback=8)
+            # Token budget per request; batches are packed by token count, not input count
+            self.batch_token_budget = config.getint('EMBEDDINGS', 'openai_batch_token_budget', fallback=100000)
+            import tiktoken
+            try:
+                self.tokenizer = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self.tokenizer = tiktoken.get_encoding('cl100k_base')
+            # Token counts are cached per unique text
+            self._count_tokens = functools.lru_cache(maxsize=100000)(
+                lambda text: len(self.tokenizer.encode(text))
+            )
         elif self.provider == 'huggingface':
             model_name = config.get('EMBEDDINGS', 'hf_model', fallback='all-MiniLM-L6-v2')
-            self.model = SentenceTransformer(model_name)
-            self.dimension = self.model.get_sentence_embedding_dimension()
+            self.model_id = model_name
+            self.batch_size = config.getint('EMBEDDINGS', 'hf_batch_size', fallback=1024)
+            self.hf_backend = config.get('EMBEDDINGS', 'hf_backend', fallback='fastembed')
+            # fastembed data-parallel workers (unset = single process, ONNX threads)
+            self.hf_parallel = config.getint('EMBEDDINGS', 'hf_parallel', fallback=None)
+            
+            if self.hf_backend == 'fastembed':
+                try:
+                    from fastembed import TextEmbedding
+                    # ONNX Runtime inference is considerably faster than PyTorch on CPU
+                    fastembed_name = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+                    self.model = TextEmbedding(model_name=fastembed_name)
+                    self.dimension = len(self._embed_texts(['dimension probe'], 1)[0])
+                except (ImportError, ValueError) as e:
+                    logger.warning(f"fastembed cannot load {model_name} ({str(e)}), using sentence-transformers")
+                    self.hf_backend = 'sentence_transformers'
+            
+            if self.hf_backend != 'fastembed':
+                from sentence_transformers import SentenceTransformer
+                self.model = SentenceTransformer(model_name)
+                self.dimension = self.model.get_sentence_embedding_dimension()
         else:
             raise ValueError(f"Unsupported embedding provider: {self.provider}")
         
+        # Persistent cache so re-ingested records skip the embedding call
+        self.cache = None
+        if config.getboolean('EMBEDDINGS', 'cache_enabled', fallback=True):
+            self.cache = EmbeddingCache(
+                config.get('EMBEDDINGS', 'cache_path', fallback='data/embed_cache.db')
+            )
+        
         logger.info(f"Initialized {self.provider} embedding generator (dimension: {self.dimension})")
     
     def generate_embedding(self, text: str) -> List[float]:
@@ -62,41 +168,276 @@ class EmbeddingGenerator:
                 return response.data[0].embedding
             
             elif self.provider == 'huggingface':
-                embedding = self.model.encode(text)
-                return embedding.tolist()
+                return self._embed_texts([text], 1)[0]
                 
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}")
             raise
     
-    def generate_batch_embeddings(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+    def generate_batch_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
         """Generate embeddings for multiple texts efficiently"""
-        embeddings = []
+        batch_size = batch_size or self.batch_size
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            logger.info(f"Processing embedding batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}")
-            
-            try:
-                if self.provider == 'openai':
-                    response = openai.embeddings.create(
-                        input=batch,
-                        model=self.model
-                    )
-                    batch_embeddings = [item.embedding for item in response.data]
-                    embeddings.extend(batch_embeddings)
-                
-                elif self.provider == 'huggingface':
-                    batch_embeddings = self.model.encode(batch)
-                    embeddings.extend([emb.tolist() for emb in batch_embeddings])
-                    
-            except Exception as e:
-                logger.error(f"Error in batch embedding generation: {str(e)}")
+        if self.cache is None:
+            return self._embed_texts(texts, batch_size)
+        
+        # Only embed texts that are not already cached, then stitch in input order
+        keys = [EmbeddingCache.make_key(self.model_id, text) for text in texts]
+        embeddings_by_key = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in embeddings_by_key]
+        logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        
+        if missing:
+            new_embeddings = self._embed_texts([texts[i] for i in missing], batch_size)
+            new_items = [(keys[i], emb) for i, emb in zip(missing, new_embeddings)]
+            self.cache.put_many(new_items)
+            embeddings_by_key.update(new_items)
+        
+        return [embeddings_by_key[key] for key in keys]
+    
+    def _embed_texts(self, texts: List[str], batch_size: int) -> List[List[float]]:
+        """Call the embedding provider for texts, batch_size at a time"""
+        if self.provider == 'huggingface' and self.hf_backend == 'fastembed':
+            return [
+                emb.tolist()
+                for emb in self.model.embed(texts, batch_size=batch_size, parallel=self.hf_parallel)
+            ]
+        
+        if self.provider == 'huggingface':
+            # Hand the full list to SentenceTransformer: it sorts inputs by length
+            # so each batch pads to similar-length sentences, and returns the
+            # embeddings in the original input order.
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            return [emb.tolist() for emb in embeddings]
+        
+        return asyncio.run(self.generate_batch_embeddings_async(texts, batch_size))
+    
+    async def generate_batch_embeddings_async(self, texts: List[str], batch_size: Optional[int] = None,
+                                              concurrency: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings with several OpenAI requests in flight at once
+        
+        Bypasses the embedding cache; use generate_batch_embeddings for cached lookups.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per request (defaults to the configured batch size)
+            concurrency: Max concurrent requests (defaults to max_concurrency)
+        
+        Returns:
+            Embeddings in input order
+        """
+        batch_size = batch_size or self.batch_size
+        
+        if self.provider == 'huggingface':
+            return await asyncio.to_thread(self._embed_texts, texts, batch_size)
+        
+        batches = self._pack_batches(texts, batch_size)
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+        client = openai.AsyncOpenAI(api_key=self.api_key)
+        
+        async def embed_batch(batch_num: int, batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                logger.info(f"Processing embedding batch {batch_num}/{len(batches)}")
+                return await self._create_embeddings_async(client, batch)
+        
+        try:
+            results = await asyncio.gather(
+                *(embed_batch(n, batch) for n, batch in enumerate(batches, 1)),
+                return_exceptions=True
+            )
+        finally:
+            await client.close()
+        
+        embeddings = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in batch embedding generation: {str(result)}")
                 # Generate individually as fallback
                 for text in batch:
                     embeddings.append(self.generate_embedding(text))
+            else:
+                embeddings.extend(result)
         
         return embeddings
+    
+    def _pack_batches(self, texts: List[str], max_inputs: int) -> List[List[str]]:
+        """
+        Greedily pack texts, in order, into batches bounded by the token budget
+        
+        Short trade sentences fill far more of each request than a fixed input
+        count would, so fewer round trips are needed. Texts longer than the
+        model's per-input limit are truncated to it.
+        """
+        batches = []
+        batch = []
+        batch_tokens = 0
+        
+        for text in texts:
+            n_tokens = self._count_tokens(text)
+            if n_tokens > self.MAX_INPUT_TOKENS:
+                text = self.tokenizer.decode(self.tokenizer.encode(text)[:self.MAX_INPUT_TOKENS])
+                n_tokens = self.MAX_INPUT_TOKENS
+            
+            if batch and (len(batch) >= max_inputs or batch_tokens + n_tokens > self.batch_token_budget):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            
+            batch.append(text)
+            batch_tokens += n_tokens
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    @retry(
+        retry=retry_if_exception_type(openai.RateLimitError),
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(6),
+        reraise=True
+    )
+    async def _create_embeddings_async(self, client: openai.AsyncOpenAI, batch: List[str]) -> List[List[float]]:
+        """Single embeddings request, retried with backoff on HTTP 429"""
+        response = await client.embeddings.create(input=batch, model=self.model)
+        return [item.embedding for item in response.data]
+
+# Field defaults and precompiled getters for the record formatters
+_COMTRADE_DEFAULTS = {
+    'period': 'Unknown',
+    'reporterDesc': 'Unknown Country',
+    'partnerDesc': 'World',
+    'cmdCode': 'Unknown',
+    'cmdDesc': 'Unknown Product',
+    'primaryValue': 0,
+    'qty': 0,
+    'qtyUnitAbbr': 'units',
+    'flowDesc': 'Import',
+}
+_get_comtrade_fields = operator.itemgetter(*_COMTRADE_DEFAULTS)
+
+_BL_DEFAULTS = {
+    'shipment_date': 'Unknown Date',
+    'buyer': 'Unknown Buyer',
+    'supplier': 'Unknown Supplier',
+    'hs_code': 'Unknown',
+    'product_description': 'Unknown Product',
+    'quantity': 0,
+    'weight_kg': 0,
+    'origin_country': 'Unknown',
+    'destination_country': 'Unknown',
+    'port_of_loading': 'Unknown Port',
+    'port_of_discharge': 'Unknown Port',
+}
+_get_bl_fields = operator.itemgetter(*_BL_DEFAULTS)
+
+# Provider-specific B/L field names -> canonical names
+_BL_ALIASES = {
+    'date': 'shipment_date',
+    'consignee': 'buyer',
+    'shipper': 'supplier',
+    'hscode': 'hs_code',
+    'description': 'product_description',
+    'qty': 'quantity',
+    'weight': 'weight_kg',
+    'country_of_origin': 'origin_country',
+    'country_of_destination': 'destination_country',
+}
+
+# Comtrade period: YYYY for annual data, YYYYMM for monthly
+_PERIOD_PATTERN = re.compile(r'(\d{4})(0[1-9]|1[0-2])?')
+
+def _present(record: Dict) -> Dict:
+    """Record without null fields, so defaults apply to them as to missing ones"""
+    return {k: v for k, v in record.items() if v is not None}
+
+def _parse_period(period) -> Tuple[str, Optional[str]]:
+    """(year, month) of a Comtrade period, month None for annual data"""
+    match = _PERIOD_PATTERN.fullmatch(str(period).strip())
+    if match is None:
+        raise ValueError(f"Malformed period: {period!r}")
+    return match.groups()
+
+def _parse_amount(value) -> float:
+    """Trade value, quantity or weight as a finite float"""
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(f"Non-finite amount: {value!r}")
+    return amount
+
+def _comtrade_fields(record: Dict) -> Tuple:
+    """
+    Validated Comtrade fields, shared by the per-record and batch formatters
+    so both accept and skip the same records
+    
+    Returns:
+        (year, month, reporter, partner, hs_code, hs_desc, trade_value, qty, qty_unit, flow)
+    
+    Raises:
+        ValueError/TypeError: malformed period or non-numeric value/quantity
+    """
+    (period, reporter, partner, hs_code, hs_desc,
+     trade_value, qty, qty_unit, flow) = _get_comtrade_fields({**_COMTRADE_DEFAULTS, **_present(record)})
+    year, month = _parse_period(period)
+    return (year, month, str(reporter), str(partner), str(hs_code), str(hs_desc),
+            _parse_amount(trade_value), _parse_amount(qty), str(qty_unit), str(flow))
+
+_COMTRADE_COLUMNS = ['year', 'month', 'reporter', 'partner', 'hs_code', 'hs_desc',
+                     'trade_value', 'qty', 'qty_unit', 'flow']
+
+def _bl_fields(record: Dict) -> Tuple:
+    """
+    Validated B/L fields, shared by the per-record and batch formatters
+    so both accept and skip the same records
+    
+    Returns:
+        (shipment_date, buyer, supplier, hs_code, product_desc, quantity_text, quantity,
+         weight_text, weight_kg, origin_country, dest_country, port_of_loading, port_of_discharge)
+    
+    Raises:
+        ValueError/TypeError: non-numeric quantity or weight
+    """
+    # Field names may vary by provider; canonical names win over aliases
+    present = _present(record)
+    aliased = {_BL_ALIASES[k]: v for k, v in present.items() if k in _BL_ALIASES}
+    (shipment_date, buyer, supplier, hs_code, product_desc, quantity, weight_kg,
+     origin_country, dest_country, port_of_loading,
+     port_of_discharge) = _get_bl_fields({**_BL_DEFAULTS, **aliased, **present})
+    return (str(shipment_date), str(buyer), str(supplier), str(hs_code), str(product_desc),
+            str(quantity), _parse_amount(quantity), str(weight_kg), _parse_amount(weight_kg),
+            str(origin_country), str(dest_country), str(port_of_loading), str(port_of_discharge))
+
+_BL_COLUMNS = ['shipment_date', 'buyer', 'supplier', 'hs_code', 'product_desc', 'quantity_text',
+               'quantity', 'weight_text', 'weight_kg', 'origin_country', 'dest_country',
+               'port_of_loading', 'port_of_discharge']
+
+def _valid_rows(records: List[Dict], fields: Callable[[Dict], Tuple], label: str) -> List[Tuple]:
+    """Validated field tuples of a batch, skipping (and counting) malformed records"""
+    rows = []
+    for record in records:
+        try:
+            rows.append(fields(record))
+        except (TypeError, ValueError):
+            pass
+    if len(rows) < len(records):
+        logger.warning(f"Skipped {len(records) - len(rows)} malformed {label} records")
+    return rows
+
+def _format_thousands(values: pd.Series) -> pd.Series:
+    """
+    Format a numeric series like '{:,.0f}', formatting each distinct value once
+    
+    Trade values and quantities repeat heavily, so factorizing first keeps the
+    Python-level format calls proportional to the number of unique values.
+    """
+    codes, uniques = pd.factorize(values)
+    formatted = np.array(['{:,.0f}'.format(value) for value in uniques], dtype=object)
+    return pd.Series(formatted[codes], index=values.index)
 
 class TextChunkFormatter:
     """Converts raw trade data into natural language chunks"""
@@ -110,44 +451,28 @@ class TextChunkFormatter:
             Tuple of (text_chunk, metadata)
         """
         try:
-            period = record.get('period', 'Unknown')
-            year = period[:4] if len(period) >= 4 else 'Unknown'
-            month = period[4:] if len(period) >= 6 else 'Unknown'
-            
-            reporter = record.get('reporterDesc', 'Unknown Country')
-            partner = record.get('partnerDesc', 'World')
-            hs_code = record.get('cmdCode', 'Unknown')
-            hs_desc = record.get('cmdDesc', 'Unknown Product')
-            
-            # Primary trade value (in USD)
-            trade_value = record.get('primaryValue', 0)
-            trade_value_formatted = f"${trade_value:,.0f}" if trade_value else "$0"
+            (year, month, reporter, partner, hs_code, hs_desc,
+             trade_value, qty, qty_unit, flow) = _comtrade_fields(record)
             
-            # Quantity
-            qty = record.get('qty', 0)
-            qty_unit = record.get('qtyUnitAbbr', 'units')
-            
-            # Flow (Import/Export)
-            flow = record.get('flowDesc', 'Import')
-            
-            # Create natural language chunk
+            # Create natural language chunk (trade value in USD)
+            when = f"{month}/{year}" if month else year
             text = (
-                f"Trade Statistics Update: In {month}/{year}, {reporter}'s {flow.lower()}s "
-                f"of {hs_desc} (HS Code: {hs_code}) from {partner} totaled {trade_value_formatted}. "
+                f"Trade Statistics Update: In {when}, {reporter}'s {flow.lower()}s "
+                f"of {hs_desc} (HS Code: {hs_code}) from {partner} totaled ${trade_value:,.0f}. "
                 f"The quantity was {qty:,.0f} {qty_unit}."
             )
             
-            # Metadata for filtering
+            # Metadata for filtering; annual data is dated to January
             metadata = {
                 'source': 'comtrade',
-                'date': f"{year}-{month}-01",
-                'hs_code': str(hs_code),
+                'date': f"{year}-{month or '01'}-01",
+                'hs_code': hs_code,
                 'reporter_country': reporter,
                 'partner_country': partner,
-                'trade_value_usd': float(trade_value) if trade_value else 0.0,
-                'quantity': float(qty) if qty else 0.0,
+                'trade_value_usd': trade_value,
+                'quantity': qty,
                 'flow': flow,
-                'period': period
+                'period': year + (month or '')
             }
             
             return text, metadata
@@ -165,29 +490,16 @@ class TextChunkFormatter:
             Tuple of (text_chunk, metadata)
         """
         try:
-            # Extract fields (field names may vary by provider)
-            shipment_date = record.get('shipment_date', record.get('date', 'Unknown Date'))
-            buyer = record.get('buyer', record.get('consignee', 'Unknown Buyer'))
-            supplier = record.get('supplier', record.get('shipper', 'Unknown Supplier'))
-            
-            hs_code = record.get('hs_code', record.get('hscode', 'Unknown'))
-            product_desc = record.get('product_description', record.get('description', 'Unknown Product'))
-            
-            quantity = record.get('quantity', record.get('qty', 0))
-            weight_kg = record.get('weight_kg', record.get('weight', 0))
-            
-            origin_country = record.get('origin_country', record.get('country_of_origin', 'Unknown'))
-            dest_country = record.get('destination_country', record.get('country_of_destination', 'Unknown'))
-            
-            port_of_loading = record.get('port_of_loading', 'Unknown Port')
-            port_of_discharge = record.get('port_of_discharge', 'Unknown Port')
+            (shipment_date, buyer, supplier, hs_code, product_desc, quantity_text, quantity,
+             weight_text, weight_kg, origin_country, dest_country, port_of_loading,
+             port_of_discharge) = _bl_fields(record)
             
             # Create natural language chunk
             text = (
                 f"New Shipment: On {shipment_date}, '{buyer}' (in {dest_country}) "
                 f"received a shipment of {product_desc} (HS Code: {hs_code}) "
                 f"from '{supplier}' (in {origin_country}). "
-                f"The shipment contained {quantity} units weighing {weight_kg}kg, "
+                f"The shipment contained {quantity_text} units weighing {weight_text}kg, "
                 f"shipped from {port_of_loading} to {port_of_discharge}."
             )
             
@@ -195,13 +507,13 @@ class TextChunkFormatter:
             metadata = {
                 'source': 'bill_of_lading',
                 'date': shipment_date,
-                'hs_code': str(hs_code),
+                'hs_code': hs_code,
                 'buyer': buyer,
                 'supplier': supplier,
                 'origin_country': origin_country,
                 'destination_country': dest_country,
-                'quantity': float(quantity) if quantity else 0.0,
-                'weight_kg': float(weight_kg) if weight_kg else 0.0,
+                'quantity': quantity,
+                'weight_kg': weight_kg,
                 'port_of_loading': port_of_loading,
                 'port_of_discharge': port_of_discharge
             }
@@ -212,18 +524,137 @@ class TextChunkFormatter:
             logger.error(f"Error formatting B/L record: {str(e)}")
             return None, None
 
+    @staticmethod
+    def format_comtrade_records(records: List[Dict]) -> List[Tuple[str, Dict]]:
+        """
+        Batch equivalent of format_comtrade_record: fields are validated per
+        record by the same _comtrade_fields, then texts are built column-wise
+        
+        Returns:
+            List of (text_chunk, metadata) tuples, malformed records skipped
+        """
+        rows = _valid_rows(records, _comtrade_fields, 'Comtrade')
+        if not rows:
+            return []
+        
+        try:
+            df = pd.DataFrame(rows, columns=_COMTRADE_COLUMNS, dtype=object)
+            trade_value = df['trade_value'].astype(float)
+            qty = df['qty'].astype(float)
+            
+            # Annual data has no month
+            has_month = df['month'].notna()
+            month = df['month'].fillna('')
+            when = (month + "/" + df['year']).where(has_month, df['year'])
+            
+            text = (
+                "Trade Statistics Update: In " + when + ", " + df['reporter'] + "'s "
+                + df['flow'].str.lower() + "s of " + df['hs_desc'] + " (HS Code: " + df['hs_code'] + ") from "
+                + df['partner'] + " totaled $" + _format_thousands(trade_value) + ". "
+                + "The quantity was " + _format_thousands(qty) + " " + df['qty_unit'] + "."
+            )
+            
+            metadata = pd.DataFrame({
+                'source': 'comtrade',
+                'date': df['year'] + "-" + month.where(has_month, '01') + "-01",
+                'hs_code': df['hs_code'],
+                'reporter_country': df['reporter'],
+                'partner_country': df['partner'],
+                'trade_value_usd': trade_value,
+                'quantity': qty,
+                'flow': df['flow'],
+                'period': df['year'] + month
+            }).to_dict(orient='records')
+            
+            return list(zip(text.tolist(), metadata))
+            
+        except Exception as e:
+            logger.error(f"Error in vectorized Comtrade formatting, falling back per record: {str(e)}")
+            chunks = [TextChunkFormatter.format_comtrade_record(record) for record in records]
+            return [(text, metadata) for text, metadata in chunks if text and metadata]
+    
+    @staticmethod
+    def format_bl_records(records: List[Dict]) -> List[Tuple[str, Dict]]:
+        """
+        Batch equivalent of format_bl_record: fields are validated per record
+        by the same _bl_fields, then texts are built column-wise
+        
+        Returns:
+            List of (text_chunk, metadata) tuples, malformed records skipped
+        """
+        rows = _valid_rows(records, _bl_fields, 'B/L')
+        if not rows:
+            return []
+        
+        try:
+            df = pd.DataFrame(rows, columns=_BL_COLUMNS, dtype=object)
+            
+            text = (
+                "New Shipment: On " + df['shipment_date'] + ", '" + df['buyer'] + "' (in " + df['dest_country'] + ") "
+                + "received a shipment of " + df['product_desc'] + " (HS Code: " + df['hs_code'] + ") "
+                + "from '" + df['supplier'] + "' (in " + df['origin_country'] + "). "
+                + "The shipment contained " + df['quantity_text'] + " units weighing "
+                + df['weight_text'] + "kg, "
+                + "shipped from " + df['port_of_loading'] + " to " + df['port_of_discharge'] + "."
+            )
+            
+            metadata = pd.DataFrame({
+                'source': 'bill_of_lading',
+                'date': df['shipment_date'],
+                'hs_code': df['hs_code'],
+                'buyer': df['buyer'],
+                'supplier': df['supplier'],
+                'origin_country': df['origin_country'],
+                'destination_country': df['dest_country'],
+                'quantity': df['quantity'].astype(float),
+                'weight_kg': df['weight_kg'].astype(float),
+                'port_of_loading': df['port_of_loading'],
+                'port_of_discharge': df['port_of_discharge']
+            }).to_dict(orient='records')
+            
+            return list(zip(text.tolist(), metadata))
+            
+        except Exception as e:
+            logger.error(f"Error in vectorized B/L formatting, falling back per record: {str(e)}")
+            chunks = [TextChunkFormatter.format_bl_record(record) for record in records]
+            return [(text, metadata) for text, metadata in chunks if text and metadata]
+
 class VectorDBManager:
     """Manages vector database operations (Pinecone)"""
     
+    # Metadata keys dropped when they duplicate another field ('period' -> 'date')
+    REDUNDANT_METADATA_KEYS = {'period': 'date'}
+    
+    # Texts kept by fetch_texts' LRU cache
+    TEXT_CACHE_SIZE = 10000
+    
     def __init__(self, config: configparser.ConfigParser, embedding_dimension: int):
         self.provider = config.get('VECTOR_DB', 'provider', fallback='pinecone')
+        self._text_cache = OrderedDict()
         
         if self.provider == 'pinecone':
             api_key = config.get('VECTOR_DB', 'pinecone_api_key')
             self.index_name = config.get('VECTOR_DB', 'pinecone_index_name', fallback='trade-intelligence')
+            self.pool_threads = config.getint('VECTOR_DB', 'pinecone_pool_threads', fallback=30)
+            self.batch_size = config.getint('VECTOR_DB', 'pinecone_batch_size', fallback=100)
+            # Decimal places kept in upserted vector values (unset = full precision)
+            self.value_decimals = config.getint('VECTOR_DB', 'upsert_value_decimals', fallback=6)
             
-            # Initialize Pinecone
-            self.pc = Pinecone(api_key=api_key)
+            # Chunk text either rides along in metadata (truncated) or lives in a local side store
+            self.metadata_text_max_chars = config.getint('VECTOR_DB', 'metadata_text_max_chars', fallback=500)
+            self.text_store = None
+            if not config.getboolean('VECTOR_DB', 'store_text_in_metadata', fallback=True):
+                self.text_store = TextStore(
+                    config.get('VECTOR_DB', 'text_store_path', fallback='data/text_store.db')
+                )
+            
+            # Initialize Pinecone (pool_threads sizes the pool used for async_req upserts);
+            # keep-alive lets every batch reuse the pooled TLS connections
+            self.pc = Pinecone(
+                api_key=api_key,
+                pool_threads=self.pool_threads,
+                additional_headers={'Connection': 'keep-alive'}
+            )
             
             # Create index if it doesn't exist
             if self.index_name not in [idx.name for idx in self.pc.list_indexes()]:
@@ -238,7 +669,7 @@ class VectorDBManager:
                     )
                 )
             
-            self.index = self.pc.Index(self.index_name)
+            self.index = self.pc.Index(self.index_name, pool_threads=self.pool_threads)
             logger.info(f"Connected to Pinecone index: {self.index_name}")
         
         else:
@@ -253,19 +684,44 @@ class VectorDBManager:
         """
         try:
             if self.provider == 'pinecone':
+                # Round values before they are JSON-encoded: the shortest repr of a
+                # 6-decimal float is a fraction of a full float's, at negligible
+                # cosine-similarity cost
+                values = [embedding for _, embedding, _, _ in vectors]
+                if self.value_decimals is not None and values:
+                    values = np.round(np.asarray(values, dtype=np.float64), self.value_decimals).tolist()
+                
                 # Prepare data for Pinecone format
                 upsert_data = []
-                for vec_id, embedding, text, metadata in vectors:
-                    # Add text to metadata for retrieval
-                    full_metadata = {**metadata, 'text': text}
+                side_texts = []
+                for (vec_id, _, text, metadata), embedding in zip(vectors, values):
+                    full_metadata = {
+                        k: v for k, v in metadata.items()
+                        if self.REDUNDANT_METADATA_KEYS.get(k) not in metadata
+                    }
+                    if self.text_store is None:
+                        # Add text to metadata for retrieval
+                        full_metadata['text'] = text[:self.metadata_text_max_chars]
+                    else:
+                        # LlamaIndex's PineconeVectorStore requires the key; the RAG
+                        # query engine fills the text in from the side store
+                        full_metadata['text'] = ''
+                        side_texts.append((vec_id, text))
                     upsert_data.append((vec_id, embedding, full_metadata))
                 
-                # Upsert in batches
-                batch_size = 100
-                for i in range(0, len(upsert_data), batch_size):
-                    batch = upsert_data[i:i + batch_size]
-                    self.index.upsert(vectors=batch)
-                    logger.info(f"Upserted batch {i//batch_size + 1}/{(len(upsert_data)-1)//batch_size + 1}")
+                if side_texts:
+                    self.text_store.put_many(side_texts)
+                
+                # Upsert batches in parallel over the client's thread pool
+                async_results = [
+                    self.index.upsert(vectors=upsert_data[i:i + self.batch_size], async_req=True)
+                    for i in range(0, len(upsert_data), self.batch_size)
+                ]
+                
+                # Wait for every batch to be acknowledged
+                for async_result in async_results:
+                    async_result.get()
+                logger.info(f"Upserted {len(async_results)} batches in parallel")
                 
                 logger.info(f"Successfully upserted {len(vectors)} vectors")
                 
@@ -274,7 +730,7 @@ class VectorDBManager:
             raise
     
     def query_vectors(self, query_embedding: List[float], top_k: int = 10, 
-                     filter_dict: Optional[Dict] = None) -> List[Dict]:
+                     filter_dict: Optional[Dict] = None, include_text: bool = True) -> List[Dict]:
         """
         Query the vector database
         
@@ -282,6 +738,8 @@ class VectorDBManager:
             query_embedding: Query vector
             top_k: Number of results to return
             filter_dict: Metadata filters
+            include_text: Return text and metadata; when False only ids and
+                scores come back (fetch text later with fetch_texts)
         
         Returns:
             List of matching results with text and metadata
@@ -291,15 +749,22 @@ class VectorDBManager:
                 results = self.index.query(
                     vector=query_embedding,
                     top_k=top_k,
-                    include_metadata=True,
+                    include_metadata=include_text,
                     filter=filter_dict
                 )
                 
+                if not include_text:
+                    return [{'id': match.id, 'score': match.score} for match in results.matches]
+                
+                side_texts = {}
+                if self.text_store is not None:
+                    side_texts = self.text_store.get_many([match.id for match in results.matches])
+                
                 return [
                     {
                         'id': match.id,
                         'score': match.score,
-                        'text': match.metadata.get('text', ''),
+                        'text': side_texts.get(match.id, match.metadata.get('text', '')),
                         'metadata': {k: v for k, v in match.metadata.items() if k != 'text'}
                     }
                     for match in results.matches
@@ -309,6 +774,176 @@ class VectorDBManager:
             logger.error(f"Error querying vectors: {str(e)}")
             return []
 
+    def fetch_texts(self, ids: List[str]) -> Dict[str, str]:
+        """
+        Fetch chunk text for vector ids, e.g. the final top-k after reranking
+        
+        Recently fetched texts are kept in a small LRU cache; misses are
+        fetched from Pinecone (or the side text store) in batches of 100.
+        """
+        texts = {}
+        missing = []
+        for vec_id in dict.fromkeys(ids):
+            if vec_id in self._text_cache:
+                self._text_cache.move_to_end(vec_id)
+                texts[vec_id] = self._text_cache[vec_id]
+            else:
+                missing.append(vec_id)
+        
+        try:
+            if self.text_store is not None:
+                texts.update(self.text_store.get_many(missing))
+            else:
+                for i in range(0, len(missing), 100):
+                    response = self.index.fetch(ids=missing[i:i + 100])
+                    for vec_id, vector in response.vectors.items():
+                        texts[vec_id] = (vector.metadata or {}).get('text', '')
+        except Exception as e:
+            logger.error(f"Error fetching texts: {str(e)}")
+        
+        for vec_id in missing:
+            if vec_id in texts:
+                self._text_cache[vec_id] = texts[vec_id]
+        while len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        
+        return texts
+
+class FileManifest:
+    """SQLite manifest of raw files, handing out atomic claims to pipeline runs"""
+    
+    def __init__(self, db_path: str = 'data/manifest.db'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, status TEXT NOT NULL, claimed_at REAL, processed_at TEXT, owner TEXT)'
+        )
+        if 'owner' not in {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}:
+            self.conn.execute('ALTER TABLE files ADD COLUMN owner TEXT')
+        # Claims record their run as host:pid so a later run can tell a dead owner
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}"
+    
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that holds the database lock from the start"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+    
+    def register(self, paths: List[str]):
+        """Add newly discovered files; failed or finished paths still on disk are queued again"""
+        with self._transaction():
+            self.conn.executemany(
+                "INSERT INTO files (path, status) VALUES (?, 'new') "
+                "ON CONFLICT(path) DO UPDATE SET status = 'new' WHERE status IN ('done', 'failed')",
+                [(path,) for path in paths]
+            )
+    
+    def claim(self) -> Optional[str]:
+        """Atomically claim the next unprocessed file, or None when none are left"""
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT path FROM files WHERE status = 'new' ORDER BY path LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE files SET status = 'claimed', claimed_at = ?, owner = ? WHERE path = ?",
+                (time.time(), self.owner, row[0])
+            )
+            return row[0]
+    
+    def release_stale_claims(self, max_age_seconds: int):
+        """
+        Return files claimed by runs that died mid-processing to the queue
+        
+        A claim is stale when its owner was a process on this host that no
+        longer exists, or (for owners elsewhere) once it is older than max_age_seconds.
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT path, claimed_at, owner FROM files WHERE status = 'claimed'"
+            ).fetchall()
+            stale = [
+                (path,) for path, claimed_at, owner in rows
+                if (claimed_at or 0) < cutoff or self._owner_is_dead(owner)
+            ]
+            self.conn.executemany("UPDATE files SET status = 'new' WHERE path = ?", stale)
+    
+    def release_own_claims(self):
+        """Return files this run claimed but did not finish to the queue"""
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE files SET status = 'new' WHERE status = 'claimed' AND owner = ?",
+                (self.owner,)
+            )
+    
+    def _owner_is_dead(self, owner: Optional[str]) -> bool:
+        """True if the claim's owner was a process on this host that has exited"""
+        host, _, pid = (owner or '').rpartition(':')
+        # Signal 0 only probes for the process on POSIX (on Windows os.kill terminates it)
+        if host != self.host or not pid.isdigit() or os.name != 'posix':
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+    
+    def set_status(self, path: str, status: str, on_commit: Optional[Callable[[], None]] = None):
+        """
+        Update a file's status
+        
+        Args:
+            path: File path as registered
+            status: 'new', 'claimed', 'done', 'failed' or 'empty'
+            on_commit: Action run inside the transaction (e.g. moving the file);
+                if it raises, the status change is rolled back
+        """
+        with self._transaction():
+            self.conn.execute(
+                'UPDATE files SET status = ?, processed_at = ? WHERE path = ?',
+                (status, datetime.now().isoformat(), path)
+            )
+            if on_commit:
+                on_commit()
+
+def _open_raw_file(filepath: str):
+    """Open a raw .json or gzip-compressed .json.gz file for binary reading"""
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, 'rb')
+    return open(filepath, 'rb')
+
+def _read_chunk_windows(filepath: str, format_records: Callable[[List[Dict]], List[Tuple[str, Dict]]],
+                        window_size: int) -> Iterator[List[Tuple[str, Dict]]]:
+    """Stream records from a raw JSON file and yield formatted chunks per window"""
+    with _open_raw_file(filepath) as f:
+        records = ijson.items(f, 'item', use_float=True)
+        while True:
+            window = list(itertools.islice(records, window_size))
+            if not window:
+                break
+            yield format_records(window)
+
+def _format_file_worker(filepath: str, format_records: Callable[[List[Dict]], List[Tuple[str, Dict]]],
+                        window_size: int) -> List[List[Tuple[str, Dict]]]:
+    """Process-pool worker: format every window of a raw file"""
+    return list(_read_chunk_windows(filepath, format_records, window_size))
+
+def _windows_from_future(future: Future) -> Iterator[List[Tuple[str, Dict]]]:
+    """Yield chunk windows from a worker result, raising its error on first iteration"""
+    yield from future.result()
+
 class ETLPipeline:
     """Main ETL pipeline for processing raw data and loading into vector DB"""
     
@@ -323,6 +958,22 @@ class ETLPipeline:
         self.raw_data_dir = 'data/raw'
         self.processed_dir = 'data/processed'
         os.makedirs(self.processed_dir, exist_ok=True)
+        
+        # Records parsed, embedded and upserted together per streaming window
+        self.stream_window_size = self.config.getint('ETL', 'stream_window_size', fallback=1024)
+        self.max_pending_upserts = self.config.getint('ETL', 'max_pending_upserts', fallback=4)
+        # Chunks from consecutive small files merged into one embed+upsert cycle
+        self.coalesce_target_size = self.config.getint(
+            'ETL', 'coalesce_target_size', fallback=self.stream_window_size
+        )
+        # Manifest of raw files and their processing status
+        self.manifest = FileManifest(self.config.get('ETL', 'manifest_path', fallback='data/manifest.db'))
+        # Claims held by runs on other hosts are released after this long
+        self.claim_timeout_seconds = self.config.getint('ETL', 'claim_timeout_seconds', fallback=3600)
+        
+        # Worker processes formatting files in parallel (1 = stream windows in-process).
+        # Opt-in: a pooled file is formatted whole and held in memory until consumed
+        self.format_workers = self.config.getint('ETL', 'format_workers', fallback=1)
     
     def process_raw_data_files(self):
         """Process all unprocessed raw data files"""
@@ -330,118 +981,204 @@ class ETLPipeline:
         logger.info("Starting ETL & Vectorization Pipeline")
         logger.info("=" * 80)
         
-        # Find all raw JSON files
-        comtrade_files = glob.glob(os.path.join(self.raw_data_dir, 'comtrade_*.json'))
-        bl_files = glob.glob(os.path.join(self.raw_data_dir, 'bl_*.json'))
+        # Find all raw JSON files (plain or gzip-compressed)
+        comtrade_files = self._find_raw_files('comtrade_')
+        bl_files = self._find_raw_files('bl_')
         
         logger.info(f"Found {len(comtrade_files)} Comtrade files and {len(bl_files)} B/L files")
         
-        total_records = 0
+        # Files are claimed one at a time from the manifest, so concurrent runs
+        # never pick up the same file
+        self.manifest.register(comtrade_files + bl_files)
+        self.manifest.release_stale_claims(self.claim_timeout_seconds)
+        jobs = (self._job_for(filepath) for filepath in iter(self.manifest.claim, None))
         
-        # Process Comtrade files
-        for filepath in comtrade_files:
-            records_processed = self._process_comtrade_file(filepath)
-            total_records += records_processed
-        
-        # Process B/L files
-        for filepath in bl_files:
-            records_processed = self._process_bl_file(filepath)
-            total_records += records_processed
+        try:
+            if self.format_workers > 1 and len(comtrade_files) + len(bl_files) > 1:
+                # Format files in worker processes; embedding and upsert stay in this
+                # process so they share one Pinecone client and one OpenAI rate limit
+                with ProcessPoolExecutor(max_workers=self.format_workers) as pool:
+                    total_records = self._process_sources(self._format_in_pool(pool, jobs))
+            else:
+                total_records = self._process_sources(
+                    (job, _read_chunk_windows(job[0], job[3], self.stream_window_size)) for job in jobs
+                )
+        finally:
+            # On an interrupt or crash, unfinished files go back to the queue for the next run
+            self.manifest.release_own_claims()
         
         logger.info("=" * 80)
         logger.info(f"ETL Pipeline Complete - Processed {total_records} total records")
         logger.info("=" * 80)
     
-    def _process_comtrade_file(self, filepath: str) -> int:
-        """Process a single Comtrade data file"""
-        try:
-            logger.info(f"Processing Comtrade file: {filepath}")
-            
-            with open(filepath, 'r') as f:
-                records = json.load(f)
-            
-            if not records:
-                logger.warning(f"No records in file: {filepath}")
-                return 0
-            
-            # Format records into text chunks
-            chunks = []
-            for record in records:
-                text, metadata = self.formatter.format_comtrade_record(record)
-                if text and metadata:
-                    chunks.append((text, metadata))
-            
-            # Generate embeddings
-            texts = [chunk[0] for chunk in chunks]
-            embeddings = self.embedding_gen.generate_batch_embeddings(texts)
-            
-            # Prepare vectors for insertion
-            vectors = []
-            for i, (text, metadata) in enumerate(chunks):
-                vec_id = f"comtrade_{datetime.now().strftime('%Y%m%d%H%M%S')}_{i}"
-                vectors.append((vec_id, embeddings[i], text, metadata))
-            
-            # Upsert to vector DB
-            self.vector_db.upsert_vectors(vectors)
-            
-            # Move to processed directory
-            self._mark_as_processed(filepath)
-            
-            logger.info(f"Processed {len(chunks)} Comtrade records from {filepath}")
-            return len(chunks)
+    def _find_raw_files(self, prefix: str) -> List[str]:
+        """Raw files for one source, both .json and .json.gz"""
+        return [
+            filepath
+            for pattern in (f'{prefix}*.json', f'{prefix}*.json.gz')
+            for filepath in glob.glob(os.path.join(self.raw_data_dir, pattern))
+        ]
+    
+    def _job_for(self, filepath: str) -> Tuple:
+        """(filepath, label, id_prefix, format_records) for a raw file"""
+        if os.path.basename(filepath).startswith('comtrade_'):
+            return filepath, 'Comtrade', 'comtrade', self.formatter.format_comtrade_records
+        return filepath, 'B/L', 'bl', self.formatter.format_bl_records
+    
+    def _format_in_pool(self, pool: ProcessPoolExecutor, jobs: Iterable[Tuple]) -> Iterator[Tuple]:
+        """Format files ahead in the pool, yielding (job, chunk_windows) in job order"""
+        pending = deque()
+        for job in jobs:
+            pending.append((job, pool.submit(_format_file_worker, job[0], job[3], self.stream_window_size)))
+            # Bound formatted-but-unconsumed files held in memory
+            if len(pending) > self.format_workers * 2:
+                job, future = pending.popleft()
+                yield job, _windows_from_future(future)
+        while pending:
+            job, future = pending.popleft()
+            yield job, _windows_from_future(future)
+    
+    def _process_sources(self, sources: Iterable[Tuple[Tuple, Iterable[List[Tuple[str, Dict]]]]]) -> int:
+        """
+        Run formatted chunk windows of raw files through embed -> upsert
+        
+        Chunks from consecutive files are coalesced into cycles of about
+        coalesce_target_size, so many small files share one embedding and
+        upsert round instead of paying per-request overhead for each file.
+        Embedding of cycle N+1 overlaps with the upsert of cycle N, and a
+        file is marked processed only after every cycle holding its chunks
+        has been upserted.
+        
+        Args:
+            sources: (job, chunk_windows) pairs, job as returned by _job_for
+        
+        Returns:
+            Number of chunks upserted
+        """
+        total_chunks = 0
+        cycle_chunks = []      # (id_prefix, text, metadata) for the cycle being filled
+        cycle_files = set()    # files with chunks in the cycle being filled
+        finished_jobs = []     # fully read files, marked once the cycle lands
+        chunk_counts = {}
+        failed_files = set()
+        pending_cycles = deque()
+        
+        # Upserts run on a background thread so the next cycle's embedding
+        # requests overlap with the current cycle's Pinecone writes
+        with ThreadPoolExecutor(max_workers=1) as upsert_executor:
+            for job, chunk_windows in sources:
+                filepath, label, id_prefix, _ = job
+                try:
+                    logger.info(f"Processing {label} file: {filepath}")
+                    has_records = False
+                    chunk_counts[filepath] = 0
+                    
+                    for chunks in chunk_windows:
+                        has_records = True
+                        if not chunks:
+                            continue
+                        
+                        cycle_chunks.extend((id_prefix, text, metadata) for text, metadata in chunks)
+                        cycle_files.add(filepath)
+                        chunk_counts[filepath] += len(chunks)
+                        
+                        if len(cycle_chunks) >= self.coalesce_target_size:
+                            pending_cycles.append(self._submit_cycle(
+                                upsert_executor, cycle_chunks, cycle_files, finished_jobs
+                            ))
+                            cycle_chunks, cycle_files, finished_jobs = [], set(), []
+                            # Bound the cycles held in flight
+                            while len(pending_cycles) > self.max_pending_upserts:
+                                total_chunks += self._settle_cycle(pending_cycles.popleft(), failed_files, chunk_counts)
+                    
+                    if has_records:
+                        finished_jobs.append(job)
+                    else:
+                        logger.warning(f"No records in file: {filepath}")
+                        self.manifest.set_status(filepath, 'empty')
+                    
+                except Exception as e:
+                    logger.error(f"Error processing {label} file {filepath}: {str(e)}")
+                    # The next run's register() queues the file again
+                    failed_files.add(filepath)
+                    self.manifest.set_status(filepath, 'failed')
             
+            if cycle_chunks or finished_jobs:
+                pending_cycles.append(self._submit_cycle(upsert_executor, cycle_chunks, cycle_files, finished_jobs))
+            while pending_cycles:
+                total_chunks += self._settle_cycle(pending_cycles.popleft(), failed_files, chunk_counts)
+        
+        return total_chunks
+    
+    def _submit_cycle(self, upsert_executor: ThreadPoolExecutor, cycle_chunks: List[Tuple[str, str, Dict]],
+                      cycle_files: set, finished_jobs: List[Tuple]) -> Tuple:
+        """Embed a cycle's chunks and queue their upsert; embedding errors surface on the future"""
+        try:
+            if not cycle_chunks:
+                future = Future()
+                future.set_result(None)
+            else:
+                if len(cycle_files) > 1:
+                    logger.info(f"Coalesced {len(cycle_chunks)} chunks from {len(cycle_files)} files")
+                
+                # Generate embeddings
+                embeddings = self._embed_chunks([(text, metadata) for _, text, metadata in cycle_chunks])
+                
+                # Prepare vectors for insertion; content-derived IDs make
+                # re-ingesting the same record overwrite rather than duplicate
+                vectors = []
+                for (id_prefix, text, metadata), embedding in zip(cycle_chunks, embeddings):
+                    vec_id = f"{id_prefix}_{hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()}"
+                    vectors.append((vec_id, embedding, text, metadata))
+                
+                # Upsert to vector DB
+                future = upsert_executor.submit(self.vector_db.upsert_vectors, vectors)
         except Exception as e:
-            logger.error(f"Error processing Comtrade file {filepath}: {str(e)}")
-            return 0
+            future = Future()
+            future.set_exception(e)
+        
+        return future, cycle_files, finished_jobs, len(cycle_chunks)
     
-    def _process_bl_file(self, filepath: str) -> int:
-        """Process a single B/L data file"""
+    def _settle_cycle(self, cycle: Tuple, failed_files: set, chunk_counts: Dict[str, int]) -> int:
+        """Wait for a cycle's upsert, then mark the files it completed as processed"""
+        future, cycle_files, finished_jobs, num_chunks = cycle
+        
         try:
-            logger.info(f"Processing B/L file: {filepath}")
-            
-            with open(filepath, 'r') as f:
-                records = json.load(f)
-            
-            if not records:
-                logger.warning(f"No records in file: {filepath}")
-                return 0
-            
-            # Format records into text chunks
-            chunks = []
-            for record in records:
-                text, metadata = self.formatter.format_bl_record(record)
-                if text and metadata:
-                    chunks.append((text, metadata))
-            
-            # Generate embeddings
-            texts = [chunk[0] for chunk in chunks]
-            embeddings = self.embedding_gen.generate_batch_embeddings(texts)
-            
-            # Prepare vectors for insertion
-            vectors = []
-            for i, (text, metadata) in enumerate(chunks):
-                vec_id = f"bl_{datetime.now().strftime('%Y%m%d%H%M%S')}_{i}"
-                vectors.append((vec_id, embeddings[i], text, metadata))
-            
-            # Upsert to vector DB
-            self.vector_db.upsert_vectors(vectors)
-            
+            future.result()
+        except Exception as e:
+            logger.error(f"Error upserting {num_chunks} chunks from {len(cycle_files)} files: {str(e)}")
+            # The next run's register() queues these files again
+            for filepath in cycle_files - failed_files:
+                self.manifest.set_status(filepath, 'failed')
+            failed_files.update(cycle_files)
+            num_chunks = 0
+        
+        for filepath, label, _, _ in finished_jobs:
+            if filepath in failed_files:
+                continue
             # Move to processed directory
             self._mark_as_processed(filepath)
-            
-            logger.info(f"Processed {len(chunks)} B/L records from {filepath}")
-            return len(chunks)
-            
-        except Exception as e:
-            logger.error(f"Error processing B/L file {filepath}: {str(e)}")
-            return 0
+            logger.info(f"Processed {chunk_counts[filepath]} {label} records from {filepath}")
+        
+        return num_chunks
+    
+    def _embed_chunks(self, chunks: List[Tuple[str, Dict]]) -> List[List[float]]:
+        """Generate embeddings for chunks, embedding each unique text only once"""
+        unique_texts = list(dict.fromkeys(text for text, _ in chunks))
+        if len(unique_texts) < len(chunks):
+            logger.info(f"Deduplicated {len(chunks)} chunks to {len(unique_texts)} unique texts")
+        
+        unique_embeddings = self.embedding_gen.generate_batch_embeddings(unique_texts)
+        embedding_by_text = dict(zip(unique_texts, unique_embeddings))
+        return [embedding_by_text[text] for text, _ in chunks]
     
     def _mark_as_processed(self, filepath: str):
         """Move processed file to processed directory"""
         try:
             filename = os.path.basename(filepath)
             processed_path = os.path.join(self.processed_dir, filename)
-            os.rename(filepath, processed_path)
+            # Status update and rename commit together
+            self.manifest.set_status(filepath, 'done', on_commit=lambda: os.rename(filepath, processed_path))
             logger.debug(f"Moved {filename} to processed directory")
         except Exception as e:
             logger.error(f"Error moving file to processed: {str(e)}")
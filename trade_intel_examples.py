@@ -210,27 +210,40 @@ def example_test_alert():
 """
 Example 6: Data Validation Script
 """
+def _peek_raw_file(filepath):
+    """Parse only the first record of a raw .json / .json.gz file (runs in a worker process)"""
+    import gzip
+    import ijson
+    
+    opener = gzip.open if filepath.endswith('.gz') else open
+    try:
+        with opener(filepath, 'rb') as f:
+            first = next(ijson.items(f, 'item', use_float=True), None)
+        return filepath, first, None
+    except Exception as e:
+        return filepath, None, str(e)
+
 def example_validate_data():
     """Validate ingested data quality"""
-    import json
     import glob
+    from multiprocessing import Pool
     
-    raw_files = glob.glob('data/raw/*.json')
+    raw_files = glob.glob('data/raw/*.json') + glob.glob('data/raw/*.json.gz')
     
     print(f"\n{'='*80}")
     print("Data Validation Report")
     print(f"{'='*80}\n")
     
-    for filepath in raw_files[:5]:  # Check first 5 files
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        print(f"\nFile: {filepath}")
-        print(f"Records: {len(data)}")
-        
-        if data:
-            sample = data[0]
-            print(f"Sample keys: {list(sample.keys())[:5]}")
+    # Every file is checked, in parallel, reading only up to its first record
+    with Pool() as pool:
+        for filepath, sample, error in pool.imap_unordered(_peek_raw_file, raw_files):
+            print(f"\nFile: {filepath}")
+            if error:
+                print(f"Invalid JSON: {error}")
+            elif sample is None:
+                print("Records: none")
+            else:
+                print(f"Sample keys: {list(sample.keys())[:5]}")
 
 """
 Example 7: Vector Database Statistics
@@ -335,42 +348,46 @@ def run_end_to_end_test():
 """
 Example 10: Generate Sample Data (for testing)
 """
-def generate_sample_data():
-    """Generate sample data files for testing"""
+def generate_sample_data(num_records: int = 1):
+    """Generate sample data files for testing (num_records per source)"""
     import json
-    from datetime import datetime, timedelta
+    import numpy as np
+    from datetime import datetime
+    
+    # Dates for all records in one vectorized pass: shipments on each of the
+    # days before today, Comtrade periods stepping back month by month
+    offsets = np.arange(num_records)
+    shipment_dates = (np.datetime64('today', 'D') - 1 - offsets).astype(str)
+    periods = np.char.replace((np.datetime64('2023-10', 'M') - offsets).astype(str), '-', '')
     
     # Sample Comtrade data
-    comtrade_sample = [
-        {
-            "period": "202310",
-            "reporterDesc": "Germany",
-            "partnerDesc": "China",
-            "cmdCode": "851712",
-            "cmdDesc": "Smartphones",
-            "primaryValue": 50000000,
-            "qty": 100000,
-            "qtyUnitAbbr": "units",
-            "flowDesc": "Import"
-        }
-    ]
+    comtrade_template = {
+        "period": "202310",
+        "reporterDesc": "Germany",
+        "partnerDesc": "China",
+        "cmdCode": "851712",
+        "cmdDesc": "Smartphones",
+        "primaryValue": 50000000,
+        "qty": 100000,
+        "qtyUnitAbbr": "units",
+        "flowDesc": "Import"
+    }
+    comtrade_sample = [{**comtrade_template, "period": period} for period in periods.tolist()]
     
     # Sample B/L data
-    bl_sample = [
-        {
-            "shipment_date": (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-            "buyer": "TechCorp Germany",
-            "supplier": "Manufacturing Ltd China",
-            "hs_code": "851712",
-            "product_description": "Smartphone Model X",
-            "quantity": 5000,
-            "weight_kg": 2500,
-            "origin_country": "China",
-            "destination_country": "Germany",
-            "port_of_loading": "Shanghai",
-            "port_of_discharge": "Hamburg"
-        }
-    ]
+    bl_template = {
+        "buyer": "TechCorp Germany",
+        "supplier": "Manufacturing Ltd China",
+        "hs_code": "851712",
+        "product_description": "Smartphone Model X",
+        "quantity": 5000,
+        "weight_kg": 2500,
+        "origin_country": "China",
+        "destination_country": "Germany",
+        "port_of_loading": "Shanghai",
+        "port_of_discharge": "Hamburg"
+    }
+    bl_sample = [{"shipment_date": date, **bl_template} for date in shipment_dates.tolist()]
     
     # Save sample files
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -403,7 +420,9 @@ if __name__ == "__main__":
             'sample': generate_sample_data
         }
         
-        if example in examples:
+        if example == 'sample' and len(sys.argv) > 2:
+            generate_sample_data(int(sys.argv[2]))
+        elif example in examples:
             examples[example]()
         else:
             print(f"Available examples: {', '.join(examples.keys())}")
@@ -419,4 +438,4 @@ if __name__ == "__main__":
         print("  stats      - Vector DB stats")
         print("  formatter  - Custom formatter")
         print("  e2e        - End-to-end test")
-        print("  sample     - Generate sample data")
+        print("  sample [N] - Generate sample data (N records per source)")
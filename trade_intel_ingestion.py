@@ -5,23 +5,60 @@ Author: AI Trade Intelligence System
 """
 
 import os
+import re
 import sys
 import json
+import atexit
+import functools
+import gzip
+import hashlib
 import logging
+import logging.handlers
+import ijson
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tenacity import (before_sleep_log, retry, retry_if_exception_type,
+                      stop_after_attempt, wait_exponential_jitter)
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generator, Iterable, Iterator, List, Dict, Optional, Tuple
 import configparser
+import queue
+import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Configure logging
+try:
+    import orjson
+except ImportError:  # Fall back to the slower stdlib encoder
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Fall back to requests' stdlib JSON decoding
+    msgspec = None
+
+# Configure logging. Worker threads only enqueue records; a single listener
+# thread formats them and does the file/console I/O.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('logs/data_ingestion.log', delay=True),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers,
+                                               respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/data_ingestion.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -29,22 +66,489 @@ class ConfigManager:
     """Manages configuration from config.ini file"""
     
     def __init__(self, config_path='config.ini'):
+        self.config_path = config_path
+        # Resolved values per (section, key); cleared by reload()
+        self._cache = {}
         self.config = configparser.ConfigParser()
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         self.config.read(config_path)
         logger.info(f"Configuration loaded from {config_path}")
     
+    def reload(self):
+        """Re-read the configuration file and drop cached values"""
+        config = configparser.ConfigParser()
+        config.read(self.config_path)
+        self.config = config
+        self._cache.clear()
+        logger.info(f"Configuration reloaded from {self.config_path}")
+    
     def get(self, section: str, key: str, fallback: str = None) -> str:
-        """Safely get configuration value"""
+        """Safely get configuration value (memoized until reload())"""
+        value = self._cache.get((section, key))
+        if value is not None:
+            return value
         try:
-            return self.config.get(section, key)
+            value = self.config.get(section, key)
         except (configparser.NoSectionError, configparser.NoOptionError) as e:
             if fallback is not None:
                 logger.warning(f"Config key {section}.{key} not found, using fallback")
                 return fallback
             logger.error(f"Required config key not found: {section}.{key}")
             raise
+        self._cache[(section, key)] = value
+        return value
+
+def dump_record(record: Dict) -> bytes:
+    """Serialize one record to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+def record_digest(record: Dict) -> bytes:
+    """Stable 16-byte content hash of a record (key order does not matter)"""
+    if orjson is not None:
+        encoded = orjson.dumps(record, option=orjson.OPT_SORT_KEYS)
+    else:
+        encoded = json.dumps(record, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+class ReadAheadReader:
+    """
+    File-like view of a streamed response body that keeps downloading on a
+    background thread while the caller parses, holding up to max_chunks ahead
+    """
+    
+    def __init__(self, response: requests.Response, max_chunks: int, chunk_size: int = 64 * 1024):
+        self._chunks = queue.Queue(maxsize=max_chunks)
+        self._buffer = b''
+        self._eof = False
+        self._error = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._fill, args=(response, chunk_size), daemon=True)
+        self._thread.start()
+    
+    def _fill(self, response: requests.Response, chunk_size: int):
+        """Background thread: move decoded body chunks into the queue, then an empty EOF chunk"""
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if chunk and not self._put(chunk):
+                    return
+        except Exception as e:
+            self._error = e
+        self._put(b'')
+    
+    def _put(self, chunk: bytes) -> bool:
+        """Queue a chunk; False once the reader has been closed"""
+        while not self._closed.is_set():
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def read(self, size: int = -1) -> bytes:
+        """Return up to size bytes (everything left if size < 0); b'' at end of body"""
+        while not self._eof and (size < 0 or not self._buffer):
+            chunk = self._chunks.get()
+            if not chunk:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+            self._buffer += chunk
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+    
+    def close(self):
+        """Stop the background download"""
+        self._closed.set()
+
+def stream_records(response: requests.Response, prefix: str,
+                   on_complete: Optional[Callable[[], None]] = None,
+                   read_ahead_chunks: int = 0) -> Generator[Dict, None, None]:
+    """
+    Yield records from a streamed JSON response as the body arrives
+    
+    Args:
+        response: Response opened with stream=True
+        prefix: ijson path of the records array items (e.g. 'data.item')
+        on_complete: Called once the whole body has been consumed without error
+        read_ahead_chunks: Body chunks downloaded ahead of the parser on a
+            background thread (0 reads the socket only when the parser asks)
+    
+    Yields:
+        Record dictionaries; the connection is released once iteration ends
+    """
+    with response:
+        if read_ahead_chunks > 0:
+            body = ReadAheadReader(response, read_ahead_chunks)
+        else:
+            response.raw.decode_content = True
+            body = response.raw
+        try:
+            yield from ijson.items(body, prefix, use_float=True)
+        finally:
+            if read_ahead_chunks > 0:
+                body.close()
+    if on_complete is not None:
+        on_complete()
+
+def no_records() -> Generator[Dict, None, None]:
+    """Empty record stream, e.g. for a 304 Not Modified response"""
+    yield from ()
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    """Split a list into consecutive chunks of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class RawDataWriter:
+    """
+    Collects one source's records from every worker thread into a single JSON array file
+    
+    Workers encode records into a local buffer and append it to the shared file in
+    one locked write once it reaches flush_bytes, instead of each HS code paying for
+    its own small file. Paths ending in .gz are gzip-compressed as they are written.
+    
+    Records go to a .tmp sibling that is renamed over filepath on close, so readers
+    such as the ETL stage never see a partially written file.
+    """
+    
+    def __init__(self, filepath: str, flush_bytes: int = 1 << 20, compresslevel: int = 3):
+        self.filepath = filepath
+        self.tmp_path = filepath + '.tmp'
+        self.flush_bytes = flush_bytes
+        self.count = 0
+        self._lock = threading.Lock()
+        if filepath.endswith('.gz'):
+            self._file = gzip.open(self.tmp_path, 'wb', compresslevel=compresslevel)
+        else:
+            self._file = open(self.tmp_path, 'wb')
+        self._file.write(b'[')
+    
+    def write_records(self, records: Iterable[Dict], seen: Optional['SeenSet'] = None) -> int:
+        """
+        Append records to the file in bulk flushes
+        
+        Args:
+            records: Records to append
+            seen: If given, records whose content was already ingested are skipped;
+                the others are marked seen only once their buffer is on disk
+        
+        Returns:
+            Number of records appended
+        """
+        buffer = []
+        digests = []
+        buffered_bytes = 0
+        written = 0
+        try:
+            for record in records:
+                if seen is not None:
+                    digest = record_digest(record)
+                    if not seen.claim(digest):
+                        continue
+                    digests.append(digest)
+                encoded = dump_record(record)
+                buffer.append(encoded)
+                buffered_bytes += len(encoded)
+                written += 1
+                if buffered_bytes >= self.flush_bytes:
+                    self._flush(buffer, seen, digests)
+                    buffer = []
+                    digests = []
+                    buffered_bytes = 0
+            if buffer:
+                self._flush(buffer, seen, digests)
+        except BaseException:
+            # Records still in the buffer never reached the file
+            if seen is not None:
+                seen.release(digests)
+            raise
+        return written
+    
+    def _flush(self, buffer: List[bytes], seen: Optional['SeenSet'] = None, digests: Iterable[bytes] = ()):
+        """Append encoded records as one write, then mark their hashes seen"""
+        with self._lock:
+            self._file.write((b',\n' if self.count else b'\n') + b',\n'.join(buffer))
+            self.count += len(buffer)
+        if seen is not None:
+            seen.add(digests)
+    
+    def close(self) -> int:
+        """Terminate the JSON array and publish the file (none if nothing was written); returns the record count"""
+        with self._lock:
+            try:
+                self._file.write(b'\n]\n')
+                self._file.close()
+                if self.count:
+                    # Atomic on POSIX and Windows
+                    os.replace(self.tmp_path, self.filepath)
+                    logger.debug(f"Saved {self.count} records to {self.filepath}")
+            finally:
+                if os.path.exists(self.tmp_path):
+                    os.remove(self.tmp_path)
+            return self.count
+
+class IngestionState:
+    """
+    HTTP validators (ETag / Last-Modified) of the last successful fetch per request, in SQLite
+    
+    Validators seen during a run are only staged; commit() persists them once the
+    run's raw files have been written, so a failed run never suppresses a re-fetch.
+    """
+    
+    def __init__(self, db_path: str = 'data/state.db'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # Worker threads read validators, so share one guarded connection
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self._staged = {}
+        with self.lock:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS validators ('
+                'source TEXT NOT NULL, request_key TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+                'PRIMARY KEY (source, request_key))'
+            )
+            self.conn.commit()
+    
+    def conditional_headers(self, source: str, request_key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously fetched request"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified FROM validators WHERE source = ? AND request_key = ?',
+                (source, request_key)
+            ).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+    
+    def stage(self, source: str, request_key: str, etag: Optional[str], last_modified: Optional[str]):
+        """Remember a fully received response's validators until commit()"""
+        if etag or last_modified:
+            with self.lock:
+                self._staged[(source, request_key)] = (etag, last_modified)
+    
+    def commit(self):
+        """Persist staged validators"""
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO validators (source, request_key, etag, last_modified) VALUES (?, ?, ?, ?)',
+                [(source, key, etag, lm) for (source, key), (etag, lm) in self._staged.items()]
+            )
+            self.conn.commit()
+            self._staged.clear()
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+class SeenSet:
+    """
+    Persistent set of record content hashes already ingested, in SQLite
+    
+    Hashes added during a run stay in an open transaction (visible to this run's
+    duplicate checks) until commit(); closing without commit forgets them, so
+    records from a failed run are not skipped next time.
+    
+    A worker first claims a record's hash, so concurrent workers don't both write
+    it, and add()s the hash only after the record has been written to disk.
+    Claims of records that were never written are released.
+    """
+    
+    def __init__(self, db_path: str = 'data/seen.db'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        # Worker threads check records concurrently, so share one guarded connection
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        # Hashes of records being written by a worker but not yet on disk
+        self._claimed = set()
+        with self.lock:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS seen (hash BLOB PRIMARY KEY)')
+            self.conn.commit()
+    
+    def claim(self, digest: bytes) -> bool:
+        """Reserve a hash for writing; False if it was already seen or claimed"""
+        with self.lock:
+            if digest in self._claimed:
+                return False
+            if self.conn.execute('SELECT 1 FROM seen WHERE hash = ?', (digest,)).fetchone():
+                return False
+            self._claimed.add(digest)
+            return True
+    
+    def add(self, digests: Iterable[bytes]):
+        """Mark claimed hashes as seen once their records are written"""
+        digests = list(digests)
+        with self.lock:
+            self.conn.executemany('INSERT OR IGNORE INTO seen (hash) VALUES (?)', ((d,) for d in digests))
+            self._claimed.difference_update(digests)
+    
+    def release(self, digests: Iterable[bytes]):
+        """Drop claims on hashes whose records were not written"""
+        with self.lock:
+            self._claimed.difference_update(digests)
+    
+    def commit(self):
+        """Persist hashes added during this run"""
+        with self.lock:
+            self.conn.commit()
+    
+    def close(self):
+        """Close the database, discarding uncommitted hashes"""
+        self.conn.close()
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter shared by every worker thread calling one API
+    
+    Allows up to max_calls request starts in any period; callers beyond that
+    block until the oldest call leaves the window.
+    """
+    
+    def __init__(self, max_calls: int, period: float = 1.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request fits in the window, then record it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+def create_session(pool_size: int) -> requests.Session:
+    """
+    Create a keep-alive session whose connection pool serves every worker thread
+    
+    The adapter only retries failed connection attempts (the request never
+    reached the API). Read errors and 429/5xx responses are left to
+    get_with_retry, whose attempts each go through the API's rate limiter.
+    
+    Args:
+        pool_size: Maximum pooled connections per host (match the worker count)
+    
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=0,
+        backoff_factor=0.3,
+        status_forcelist=(),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip'})
+    return session
+
+# Statuses worth another (rate-limited) attempt
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class TransientHTTPError(requests.RequestException):
+    """Retryable HTTP status (429/5xx) returned by an API"""
+    
+    def __init__(self, response: requests.Response):
+        super().__init__(f"{response.status_code} - {response.text}", response=response)
+        self.retry_after = _retry_after_seconds(response) if response.status_code == 429 else None
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(tz=timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+_backoff = wait_exponential_jitter(initial=1, max=30)
+
+def _fetch_wait(retry_state) -> float:
+    """Honour the server's Retry-After on 429; otherwise back off exponentially with jitter"""
+    error = retry_state.outcome.exception()
+    if isinstance(error, TransientHTTPError) and error.retry_after is not None:
+        return min(error.retry_after, 60.0)
+    return _backoff(retry_state)
+
+@retry(
+    retry=retry_if_exception_type(requests.RequestException),
+    wait=_fetch_wait,
+    stop=stop_after_attempt(5),
+    before_sleep=before_sleep_log(logger, logging.DEBUG),
+    reraise=True
+)
+def get_with_retry(session: requests.Session, rate_limiter: RateLimiter,
+                   url: str, **kwargs) -> requests.Response:
+    """
+    Rate-limited GET, retried with backoff on network errors and 429/5xx responses
+    
+    Args:
+        session: Pooled session to issue the request on
+        rate_limiter: Limiter acquired before every attempt
+        url: Request URL
+        **kwargs: Passed through to session.get
+    
+    Returns:
+        Response with a non-retryable status (callers handle 200/304/4xx)
+    
+    Raises:
+        requests.RequestException: If the last attempt still failed
+    """
+    with rate_limiter:
+        response = session.get(url, **kwargs)
+    if response.status_code in RETRYABLE_STATUSES:
+        error = TransientHTTPError(response)
+        response.close()
+        raise error
+    return response
+
+# Valid HS codes are exactly six ASCII digits
+_HS_CODE_RE = re.compile(rb'[0-9]{6}')
+
+@functools.lru_cache(maxsize=4)
+def _parse_hs_codes(path: str, mtime_ns: int) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Parse an HS codes file into (valid, invalid) codes; cached per file version"""
+    with open(path, 'rb') as f:
+        lines = [line.strip() for line in f.read().splitlines()]
+    # Skip empty lines and comments
+    codes = [line for line in lines if line and not line.startswith(b'#')]
+    valid = tuple(code.decode() for code in codes if _HS_CODE_RE.fullmatch(code))
+    invalid = tuple(code.decode(errors='replace') for code in codes if not _HS_CODE_RE.fullmatch(code))
+    return valid, invalid
 
 class HSCodeManager:
     """Manages HS codes from local file"""
@@ -53,27 +557,20 @@ class HSCodeManager:
         self.hs_codes_file = hs_codes_file
     
     def load_hs_codes(self) -> List[str]:
-        """Load HS codes from text file"""
+        """Load HS codes from text file (re-parsed only when the file changes)"""
         try:
             if not os.path.exists(self.hs_codes_file):
                 logger.error(f"HS codes file not found: {self.hs_codes_file}")
                 return []
             
-            with open(self.hs_codes_file, 'r') as f:
-                # Read lines, strip whitespace, filter empty lines and comments
-                codes = [line.strip() for line in f 
-                        if line.strip() and not line.strip().startswith('#')]
-            
-            # Validate HS codes (should be 6 digits)
-            valid_codes = []
-            for code in codes:
-                if len(code) == 6 and code.isdigit():
-                    valid_codes.append(code)
-                else:
-                    logger.warning(f"Invalid HS code format: {code}")
+            valid_codes, invalid_codes = _parse_hs_codes(
+                self.hs_codes_file, os.stat(self.hs_codes_file).st_mtime_ns
+            )
+            for code in invalid_codes:
+                logger.warning(f"Invalid HS code format: {code}")
             
             logger.info(f"Loaded {len(valid_codes)} valid HS codes")
-            return valid_codes
+            return list(valid_codes)
             
         except Exception as e:
             logger.error(f"Error loading HS codes: {str(e)}")
@@ -82,12 +579,22 @@ class HSCodeManager:
 class ComtradeAPIClient:
     """Client for UN Comtrade API"""
     
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, state: Optional[IngestionState] = None):
         self.base_url = "https://comtradeapi.un.org/data/v1/get"
+        # Validators for conditional requests; None always fetches in full
+        self.state = state
         self.api_key = config.get('COMTRADE', 'api_key', fallback=None)
-        self.rate_limit_delay = 1.0  # seconds between requests
+        # HS codes sent per request as a comma-separated cmdCode (1 disables batching)
+        self.codes_per_request = int(config.get('COMTRADE', 'codes_per_request', fallback='20'))
+        self.rate_limiter = RateLimiter(
+            int(config.get('COMTRADE', 'rate_limit_calls', fallback='1')),
+            float(config.get('COMTRADE', 'rate_limit_period', fallback='1.0'))
+        )
+        self.session = create_session(int(config.get('INGESTION', 'max_workers', fallback='8')))
+        self.read_ahead_chunks = int(config.get('INGESTION', 'read_ahead_chunks', fallback='4'))
         
-    def fetch_monthly_stats(self, hs_code: str, reporter_code: str = 'all') -> Optional[List[Dict]]:
+    def fetch_monthly_stats(self, hs_code: str,
+                            reporter_code: str = 'all') -> Optional[Generator[Dict, None, None]]:
         """
         Fetch latest monthly statistics for an HS code
         
@@ -96,8 +603,24 @@ class ComtradeAPIClient:
             reporter_code: Country code or 'all'
         
         Returns:
-            List of trade statistics records
+            Generator streaming trade statistics records, or None if the request failed
+        """
+        return self.fetch_monthly_stats_batch([hs_code], reporter_code)
+    
+    def fetch_monthly_stats_batch(self, hs_codes: List[str],
+                                  reporter_code: str = 'all') -> Optional[Generator[Dict, None, None]]:
+        """
+        Fetch latest monthly statistics for several HS codes in one request
+        
+        Args:
+            hs_codes: 6-digit HS codes (sent as a comma-separated cmdCode)
+            reporter_code: Country code or 'all'
+        
+        Returns:
+            Generator streaming trade statistics records for all codes (each
+            record carries its own cmdCode), or None if the request failed
         """
+        codes = ','.join(hs_codes)
         try:
             # Calculate date range (last 3 months to ensure we get latest available data)
             end_date = datetime.now()
@@ -110,31 +633,52 @@ class ComtradeAPIClient:
                 'clCode': 'HS',  # HS Classification
                 'period': f"{start_date.strftime('%Y%m')},{end_date.strftime('%Y%m')}",
                 'reporterCode': reporter_code,
-                'cmdCode': hs_code,
+                'cmdCode': codes,
                 'flowCode': 'M',  # Imports
                 'partnerCode': 'all',
                 'partner2Code': 0,
             }
             
-            logger.info(f"Fetching Comtrade data for HS code {hs_code}")
-            response = requests.get(self.base_url, params=params, timeout=30)
+            # Ask the API to answer 304 if nothing changed since the last fetch
+            headers = self.state.conditional_headers('comtrade', codes) if self.state else {}
             
-            if response.status_code == 200:
-                data = response.json()
-                if 'data' in data and data['data']:
-                    logger.info(f"Retrieved {len(data['data'])} records for HS {hs_code}")
-                    time.sleep(self.rate_limit_delay)
-                    return data['data']
-                else:
-                    logger.warning(f"No data returned for HS {hs_code}")
-                    return []
+            logger.info(f"Fetching Comtrade data for HS codes {codes}")
+            response = get_with_retry(self.session, self.rate_limiter, self.base_url,
+                                      params=params, headers=headers, timeout=30, stream=True)
+            
+            if response.status_code == 304:
+                logger.info(f"Comtrade data for HS {codes} unchanged since last fetch")
+                response.close()
+                return no_records()
+            elif response.status_code == 200:
+                on_complete = None
+                if self.state:
+                    on_complete = functools.partial(
+                        self.state.stage, 'comtrade', codes,
+                        response.headers.get('ETag'), response.headers.get('Last-Modified')
+                    )
+                return stream_records(response, 'data.item', on_complete, self.read_ahead_chunks)
             else:
                 logger.error(f"Comtrade API error: {response.status_code} - {response.text}")
+                response.close()
                 return None
                 
         except Exception as e:
-            logger.error(f"Error fetching Comtrade data for HS {hs_code}: {str(e)}")
+            logger.error(f"Error fetching Comtrade data for HS {codes}: {str(e)}")
             return None
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+
+if msgspec is not None:
+    class ProviderEnvelope(msgspec.Struct):
+        """Record arrays a B/L provider response may carry; other fields are skipped unparsed"""
+        shipments: Optional[List[Dict]] = None
+        records: Optional[List[Dict]] = None
+        data: Optional[List[Dict]] = None
+    
+    _ENVELOPE_DECODER = msgspec.json.Decoder(ProviderEnvelope)
 
 class BLDataAPIClient:
     """
@@ -142,13 +686,25 @@ class BLDataAPIClient:
     Supports multiple providers: Trademo, Panjiva, ImportGenius
     """
     
+    # ijson paths of the shipment arrays in each provider's response
+    STREAM_PREFIXES = {
+        'trademo': 'shipments.item',
+        'panjiva': 'records.item',
+        'importgenius': 'data.item',
+    }
+    
     def __init__(self, config: ConfigManager):
         self.provider = config.get('BL_DATA', 'provider', fallback='trademo')
         self.api_key = config.get('BL_DATA', 'api_key')
         self.base_url = config.get('BL_DATA', 'base_url')
-        self.rate_limit_delay = 0.5
+        self.rate_limiter = RateLimiter(
+            int(config.get('BL_DATA', 'rate_limit_calls', fallback='2')),
+            float(config.get('BL_DATA', 'rate_limit_period', fallback='1.0'))
+        )
+        self.session = create_session(int(config.get('INGESTION', 'max_workers', fallback='8')))
+        self.read_ahead_chunks = int(config.get('INGESTION', 'read_ahead_chunks', fallback='4'))
         
-    def fetch_shipments(self, hs_code: str, days_back: int = 1) -> Optional[List[Dict]]:
+    def fetch_shipments(self, hs_code: str, days_back: int = 1) -> Optional[Generator[Dict, None, None]]:
         """
         Fetch new shipment records from last N days
         
@@ -157,7 +713,7 @@ class BLDataAPIClient:
             days_back: Number of days to look back (default: 1 for daily cron)
         
         Returns:
-            List of shipment records
+            Generator streaming shipment records, or None if the request failed
         """
         try:
             start_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
@@ -177,31 +733,53 @@ class BLDataAPIClient:
             }
             
             logger.info(f"Fetching B/L data for HS code {hs_code} from {start_date} to {end_date}")
-            response = requests.get(
+            response = get_with_retry(
+                self.session,
+                self.rate_limiter,
                 f"{self.base_url}/shipments",
                 headers=headers,
                 params=params,
-                timeout=30
+                timeout=30,
+                stream=True
             )
             
             if response.status_code == 200:
-                data = response.json()
                 # Handle different API response structures
-                shipments = self._parse_provider_response(data)
-                logger.info(f"Retrieved {len(shipments)} shipments for HS {hs_code}")
-                time.sleep(self.rate_limit_delay)
-                return shipments
+                return self._iter_provider_response(response)
             elif response.status_code == 401:
                 logger.error("B/L API authentication failed - check API key")
+                response.close()
                 return None
             else:
                 logger.error(f"B/L API error: {response.status_code} - {response.text}")
+                response.close()
                 return None
                 
         except Exception as e:
             logger.error(f"Error fetching B/L data for HS {hs_code}: {str(e)}")
             return None
     
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def _iter_provider_response(self, response: requests.Response) -> Generator[Dict, None, None]:
+        """Stream shipments for known providers; buffer the body for the generic fallback"""
+        prefix = self.STREAM_PREFIXES.get(self.provider)
+        if prefix:
+            yield from stream_records(response, prefix, read_ahead_chunks=self.read_ahead_chunks)
+        elif msgspec is not None:
+            # Typed decode only materializes the three candidate arrays
+            with response:
+                envelope = _ENVELOPE_DECODER.decode(response.content)
+            for shipments in (envelope.shipments, envelope.records, envelope.data):
+                if shipments is not None:
+                    yield from shipments
+                    break
+        else:
+            with response:
+                yield from self._parse_provider_response(response.json())
+    
     def _parse_provider_response(self, data: Dict) -> List[Dict]:
         """Parse response based on provider format"""
         if self.provider == 'trademo':
@@ -220,8 +798,26 @@ class DataIngestionPipeline:
     def __init__(self, config_path='config.ini'):
         self.config = ConfigManager(config_path)
         self.hs_manager = HSCodeManager()
-        self.comtrade_client = ComtradeAPIClient(self.config)
+        # Conditional-request state so unchanged Comtrade data is not downloaded again
+        self.state = None
+        if self.config.get('INGESTION', 'conditional_requests', fallback='true').lower() == 'true':
+            self.state = IngestionState(self.config.get('INGESTION', 'state_path', fallback='data/state.db'))
+        self.comtrade_client = ComtradeAPIClient(self.config, self.state)
+        # Sources whose records are deduplicated against everything ingested before
+        self.dedup_sources = {
+            source.strip()
+            for source in self.config.get('INGESTION', 'dedup_sources', fallback='bl,comtrade').split(',')
+            if source.strip()
+        }
+        self.seen = None
+        if self.dedup_sources:
+            self.seen = SeenSet(self.config.get('INGESTION', 'seen_path', fallback='data/seen.db'))
         self.bl_client = BLDataAPIClient(self.config)
+        self.max_workers = int(self.config.get('INGESTION', 'max_workers', fallback='8'))
+        self.write_buffer_bytes = int(self.config.get('INGESTION', 'write_buffer_bytes', fallback='1048576'))
+        # 'gzip' writes .json.gz raw files; 'none' writes plain .json
+        self.raw_compression = self.config.get('INGESTION', 'raw_compression', fallback='gzip')
+        self.gzip_level = int(self.config.get('INGESTION', 'gzip_level', fallback='3'))
         
         # Create output directory for raw data
         self.output_dir = 'data/raw'
@@ -245,21 +841,56 @@ class DataIngestionPipeline:
         total_bl_records = 0
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        # Process each HS code
-        for idx, hs_code in enumerate(hs_codes, 1):
-            logger.info(f"\nProcessing HS Code {idx}/{len(hs_codes)}: {hs_code}")
-            
-            # Fetch Comtrade data
-            comtrade_data = self.comtrade_client.fetch_monthly_stats(hs_code)
-            if comtrade_data:
-                self._save_raw_data(comtrade_data, f'comtrade_{hs_code}_{timestamp}.json')
-                total_comtrade_records += len(comtrade_data)
-            
-            # Fetch B/L data
-            bl_data = self.bl_client.fetch_shipments(hs_code)
-            if bl_data:
-                self._save_raw_data(bl_data, f'bl_{hs_code}_{timestamp}.json')
-                total_bl_records += len(bl_data)
+        # One raw file per source for the whole run
+        extension = '.json.gz' if self.raw_compression == 'gzip' else '.json'
+        writers = {
+            source: RawDataWriter(os.path.join(self.output_dir, f'{source}_{timestamp}{extension}'),
+                                  flush_bytes=self.write_buffer_bytes,
+                                  compresslevel=self.gzip_level)
+            for source in ('comtrade', 'bl')
+        }
+        # Fetch both sources for all HS codes concurrently; each client's
+        # rate limiter keeps the workers within that provider's request rate.
+        # Workers stream records straight to disk, so only counts come back
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Comtrade takes a batch of codes per request; B/L one code per request
+                futures = {}
+                for hs_chunk in chunked(hs_codes, self.comtrade_client.codes_per_request):
+                    label = ','.join(hs_chunk)
+                    fetch = functools.partial(self.comtrade_client.fetch_monthly_stats_batch, hs_chunk)
+                    future = executor.submit(self._fetch_and_save, 'comtrade', writers['comtrade'], fetch, label)
+                    futures[future] = ('comtrade', label)
+                    for hs_code in hs_chunk:
+                        fetch = functools.partial(self.bl_client.fetch_shipments, hs_code)
+                        future = executor.submit(self._fetch_and_save, 'bl', writers['bl'], fetch, hs_code)
+                        futures[future] = ('bl', hs_code)
+                
+                # Counters are only updated here on the main thread
+                for idx, future in enumerate(as_completed(futures), 1):
+                    source, hs_code = futures[future]
+                    count = future.result()
+                    logger.info(f"Completed request {idx}/{len(futures)}: {source} HS {hs_code}")
+                    if count is None:
+                        continue
+                    if count == 0:
+                        logger.warning(f"No new {source} data returned for HS {hs_code}")
+                        continue
+                    
+                    logger.info(f"Saved {count} {source} records for HS {hs_code}")
+                    if source == 'comtrade':
+                        total_comtrade_records += count
+                    else:
+                        total_bl_records += count
+        finally:
+            for writer in writers.values():
+                writer.close()
+        
+        # Raw files are complete, so fetched responses and records can now count as seen
+        if self.state:
+            self.state.commit()
+        if self.seen:
+            self.seen.commit()
         
         # Summary
         logger.info("\n" + "=" * 80)
@@ -269,21 +900,40 @@ class DataIngestionPipeline:
         logger.info(f"Total B/L Records: {total_bl_records}")
         logger.info("=" * 80)
     
-    def _save_raw_data(self, data: List[Dict], filename: str):
-        """Save raw data to JSON file"""
+    def close(self):
+        """Release API client connections and the ingestion state database"""
+        self.comtrade_client.close()
+        self.bl_client.close()
+        if self.state:
+            self.state.close()
+        if self.seen:
+            self.seen.close()
+    
+    def _fetch_and_save(self, source: str, writer: RawDataWriter,
+                        fetch: Callable[[], Optional[Generator[Dict, None, None]]],
+                        hs_code: str) -> Optional[int]:
+        """Run one fetch and stream its new records into that source's raw file; None on failure"""
+        records = fetch()
+        if records is None:
+            return None
         try:
-            filepath = os.path.join(self.output_dir, filename)
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved raw data to {filepath}")
+            if self.seen and source in self.dedup_sources:
+                return writer.write_records(records, seen=self.seen)
+            return writer.write_records(records)
         except Exception as e:
-            logger.error(f"Error saving raw data to {filename}: {str(e)}")
+            logger.error(f"Error saving raw data for HS {hs_code} to {writer.filepath}: {str(e)}")
+            return None
+        finally:
+            records.close()
 
 def main():
     """Main entry point for cron job"""
     try:
         pipeline = DataIngestionPipeline()
-        pipeline.run()
+        try:
+            pipeline.run()
+        finally:
+            pipeline.close()
     except Exception as e:
         logger.critical(f"Pipeline failed with error: {str(e)}", exc_info=True)
         sys.exit(1)
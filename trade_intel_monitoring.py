@@ -4,17 +4,34 @@ Runs critical queries on schedule and triggers alerts when conditions are met
 """
 
 import os
+import re
 import json
+import functools
+import hashlib
 import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import FrozenSet, Iterable, Iterator, List, Dict, Optional, Tuple
 import configparser
 import smtplib
+import numpy as np
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+try:
+    import orjson
+except ImportError:  # Fall back to the slower stdlib encoder
+    orjson = None
+
 # Slack integration
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Import RAG query interface
 import sys
@@ -31,9 +48,105 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Answer phrases used by 'data_found' rules, built once at import
+POSITIVE_INDICATORS = frozenset({
+    'yes', 'found', 'detected', 'identified', 'new',
+    'shipment', 'buyer', 'supplier', 'increased', 'decreased'
+})
+NEGATIVE_INDICATORS = frozenset({
+    'no', 'none', 'not found', 'no data', 'no records',
+    'no shipments', 'no buyers', 'no suppliers'
+})
+
+INDICATOR_PHRASES = POSITIVE_INDICATORS | NEGATIVE_INDICATORS
+
+class PhraseMatcher:
+    """
+    Finds every phrase of a fixed set that occurs in a text, in one regex pass
+    
+    A lookahead alternation (longest phrase first) reports the longest phrase
+    starting at each position. Any shorter phrase matching at the same position
+    is a prefix of it, so those are filled in from a precomputed table. The
+    result equals checking `phrase in text` for every phrase.
+    """
+    
+    def __init__(self, phrases: Iterable[str]):
+        phrases = sorted(set(phrases), key=len, reverse=True)
+        self._pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(phrase) for phrase in phrases) + '))'
+        ) if phrases else None
+        self._prefixes = {
+            phrase: frozenset(other for other in phrases if phrase.startswith(other))
+            for phrase in phrases
+        }
+        # Rules sharing a (cached) answer reuse one scan
+        self.find_all = functools.lru_cache(maxsize=256)(self._find_all)
+    
+    def _find_all(self, text: str) -> FrozenSet[str]:
+        if self._pattern is None:
+            return frozenset()
+        hits = set()
+        for longest in {match.group(1) for match in self._pattern.finditer(text)}:
+            hits |= self._prefixes[longest]
+        return frozenset(hits)
+
+@functools.lru_cache(maxsize=8)
+def phrase_matcher(phrases: FrozenSet[str]) -> PhraseMatcher:
+    """Shared matcher for a phrase set; rebuilt only when the set changes"""
+    return PhraseMatcher(phrases)
+
+# Order in which rules are checked; unknown priorities go last
+PRIORITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Plain-text email section for one triggered alert, and the footer closing a digest
+_SEP = '=' * 80
+_ALERT_TEMPLATE = """
+Trade Intelligence Alert Triggered
+{sep}
+
+Rule: {name}
+Priority: {priority}
+Triggered: {timestamp}
+
+Query: {query}
+
+{sep}
+ANSWER:
+{sep}
+{answer}
+
+{sep}
+Sources: {num_sources} relevant documents found
+{sep}
+"""
+_ALERT_FOOTER = """
+This is an automated alert from your Trade Intelligence Monitoring System.
+            """
+
+# Slack attachment color per priority
+_SLACK_COLOR = {
+    'low': '#36a64f',      # green
+    'medium': '#ff9900',   # orange
+    'high': '#ff0000',     # red
+    'critical': '#8b0000'  # dark red
+}
+
+def priority_rank(priority: str) -> int:
+    """Sort key for a priority; lower ranks are more urgent"""
+    return PRIORITY_ORDER.get(priority, len(PRIORITY_ORDER))
+
 class AlertRule:
     """Represents a single monitoring rule/alarm"""
     
+    __slots__ = ('rule_id', 'name', 'query', 'trigger_condition', '_keywords', 'keywords_lower',
+                 'enabled', 'priority', 'last_triggered', '_dirty')
+    
+    # Attributes written to the rules file; assigning any of them marks the rule dirty
+    PERSISTED_FIELDS = frozenset({
+        'rule_id', 'name', 'query', 'trigger_condition', 'keywords',
+        'enabled', 'priority', 'last_triggered'
+    })
+    
     def __init__(self, rule_id: str, name: str, query: str, 
                  trigger_condition: str = 'data_found',
                  keywords: List[str] = None,
@@ -55,11 +168,27 @@ class AlertRule:
         self.name = name
         self.query = query
         self.trigger_condition = trigger_condition
-        self.keywords = keywords or []
+        self.keywords = keywords
         self.enabled = enabled
         self.priority = priority
         self.last_triggered = None
     
+    def __setattr__(self, name, value):
+        if name in self.PERSISTED_FIELDS:
+            object.__setattr__(self, '_dirty', True)
+        object.__setattr__(self, name, value)
+    
+    @property
+    def keywords(self) -> List[str]:
+        """Keywords checked for by 'keyword_match' rules"""
+        return self._keywords
+    
+    @keywords.setter
+    def keywords(self, keywords: Optional[List[str]]):
+        self._keywords = keywords or []
+        # Lowercased once; matched against the phrases found in the lowercased answer
+        self.keywords_lower = frozenset(keyword.lower() for keyword in self._keywords)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization"""
         return {
@@ -86,8 +215,195 @@ class AlertRule:
             priority=data.get('priority', 'medium')
         )
         rule.last_triggered = data.get('last_triggered')
+        # Freshly loaded rules match the file until something changes
+        rule._dirty = False
         return rule
 
+def load_json(data: bytes):
+    """Parse JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump_json(obj) -> bytes:
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def dump_json_pretty(obj) -> bytes:
+    """Serialize to 2-space indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+def file_mtime(path: str) -> Optional[int]:
+    """Modification time of a file in nanoseconds, or None if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def call_with_timeout(fn, timeout: Optional[float], *args):
+    """
+    Call fn(*args) on a daemon thread and wait at most timeout seconds for it
+    
+    A call that times out is abandoned rather than killed; being a daemon thread
+    it can't keep the process alive.
+    
+    Raises:
+        TimeoutError: If fn did not finish in time
+    """
+    future = Future()
+    
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+    
+    threading.Thread(target=run, daemon=True).start()
+    return future.result(timeout=timeout)
+
+class SmartRAGCache:
+    """
+    Thread-safe TTL + LRU cache of RAG query results
+    
+    Keys combine the normalized query text with a corpus version stamp, so a
+    cached answer is reused only while the indexed data is unchanged.
+    """
+    
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 512):
+        """
+        Initialize cache
+        
+        Args:
+            ttl_seconds: Seconds a result stays valid after being stored
+            max_entries: Least recently used results are evicted beyond this size
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(query: str, corpus_version: str = '') -> str:
+        """Build a cache key from the normalized query and corpus version"""
+        normalized = ' '.join(query.strip().lower().split())
+        return hashlib.sha1(f"{normalized}\x00{corpus_version}".encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: str, result: Dict):
+        """Store a result, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+class SemanticQueryCache:
+    """
+    Reuses RAG results across paraphrased queries
+    
+    A cached result is returned only when it was produced from the same corpus
+    version, the new query's embedding is nearly identical to the cached one
+    (cosine similarity) and the documents it retrieves overlap the cached
+    answer's evidence (Jaccard). Results never outlive an ETL run, so rules
+    looking for new data always see it.
+    """
+    
+    def __init__(self, similarity_threshold: float = 0.95, min_overlap: float = 0.7,
+                 ttl_seconds: float = 3600.0, max_entries: int = 256):
+        """
+        Initialize cache
+        
+        Args:
+            similarity_threshold: Minimum cosine similarity between query embeddings
+            min_overlap: Minimum Jaccard overlap between retrieved document ids
+            ttl_seconds: Seconds a result stays valid after being stored
+            max_entries: Least recently used results are evicted beyond this size
+        """
+        self.similarity_threshold = similarity_threshold
+        self.min_overlap = min_overlap
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Unit-length query embeddings, one row per entry in self._entries
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Dict] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+    
+    def get(self, embedding: List[float], doc_ids: List[str], corpus_version: str = '') -> Optional[Dict]:
+        """Return a cached result for a similar query with overlapping evidence on this corpus version, or None"""
+        query = self._normalize(embedding)
+        doc_ids = frozenset(doc_ids)
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                return None
+            similarities = self._vectors @ query
+            for i in np.argsort(-similarities):
+                if similarities[i] < self.similarity_threshold:
+                    break
+                entry = self._entries[i]
+                if entry['version'] != corpus_version:
+                    continue
+                union = doc_ids | entry['doc_ids']
+                if union and len(doc_ids & entry['doc_ids']) / len(union) >= self.min_overlap:
+                    entry['used'] = time.monotonic()
+                    self.hits += 1
+                    return entry['result']
+            return None
+    
+    def put(self, embedding: List[float], doc_ids: List[str], result: Dict, corpus_version: str = ''):
+        """Store a result with its query embedding, evidence document ids and corpus version"""
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._expire()
+            if len(self._entries) >= self.max_entries:
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i]['used'])
+                self._keep([i != oldest for i in range(len(self._entries))])
+            self._entries.append({'result': result, 'doc_ids': frozenset(doc_ids),
+                                  'version': corpus_version, 'stored': now, 'used': now})
+            self._vectors = vector[np.newaxis, :] if self._vectors is None else np.vstack([self._vectors, vector])
+    
+    def _expire(self):
+        now = time.monotonic()
+        keep = [now - entry['stored'] <= self.ttl_seconds for entry in self._entries]
+        if not all(keep):
+            self._keep(keep)
+    
+    def _keep(self, mask: List[bool]):
+        self._entries = [entry for entry, keep in zip(self._entries, mask) if keep]
+        self._vectors = self._vectors[np.asarray(mask, dtype=bool)] if self._entries else None
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
 class AlertNotifier:
     """Handles sending alerts via different channels"""
     
@@ -104,48 +420,142 @@ class AlertNotifier:
             self.from_email = config.get('ALERTS', 'from_email')
             self.to_emails = config.get('ALERTS', 'to_emails').split(',')
         
+        # Authenticated connection kept open for the duration of smtp_session()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_session_depth = 0
+        self._smtp_lock = threading.RLock()
+        
+        # Alerts queued during a cycle and sent together by flush()
+        self._pending: List[Tuple[AlertRule, Dict, str]] = []
+        self._pending_lock = threading.Lock()
+        # Flushed digests are delivered by a background thread so network
+        # round-trips never block the monitoring cycle
+        self._dispatch_queue: queue.Queue = queue.Queue()
+        threading.Thread(target=self._dispatch_loop, name='alert-dispatch', daemon=True).start()
+        
         # Slack configuration
         self.slack_enabled = config.getboolean('ALERTS', 'slack_enabled', fallback=False)
         if self.slack_enabled:
             self.slack_webhook_url = config.get('ALERTS', 'slack_webhook_url')
+            # Keep-alive session so consecutive alerts reuse the webhook connection
+            self._http = requests.Session()
+            self._http.mount('https://', HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=4,
+                max_retries=Retry(total=3, backoff_factor=0.3)
+            ))
         
-        logger.info(f"Alert notifier initialized (Email: {self.email_enabled}, Slack: {self.slack_enabled})")
+        logger.info("Alert notifier initialized (Email: %s, Slack: %s)", self.email_enabled, self.slack_enabled)
     
     def send_alert(self, rule: AlertRule, query_result: Dict):
         """
-        Send alert through configured channels
+        Send one alert through configured channels, returning once it is delivered
+        
+        Queued alerts are not affected; they still go out with the next flush().
+        
+        Args:
+            rule: Alert rule that triggered
+            query_result: Result from RAG query
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._send_pending([(rule, query_result, timestamp)])
+    
+    def queue_alert(self, rule: AlertRule, query_result: Dict):
+        """
+        Hold a triggered alert until the next flush()
         
         Args:
             rule: Alert rule that triggered
             query_result: Result from RAG query
         """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._pending_lock:
+            self._pending.append((rule, query_result, timestamp))
+    
+    def flush(self):
+        """Hand all queued alerts to the dispatch thread as one email and one Slack message"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self._dispatch_queue.put(self._dedupe(pending))
+    
+    def _dedupe(self, pending: List[Tuple[AlertRule, Dict, str]]) -> List[Tuple[AlertRule, Dict, str]]:
+        """Keep only the highest-priority alert among those reporting the same answer and evidence"""
+        best = {}
+        signatures = []
+        for alert in pending:
+            signature = self._alert_signature(alert[1])
+            signatures.append(signature)
+            kept = best.get(signature)
+            if kept is None or priority_rank(alert[0].priority) < priority_rank(kept[0].priority):
+                best[signature] = alert
+        
+        if len(best) < len(pending):
+            logger.info("Collapsed %d duplicate alerts", len(pending) - len(best))
+        return [alert for alert, signature in zip(pending, signatures) if best[signature] is alert]
+    
+    @staticmethod
+    def _alert_signature(query_result: Dict) -> str:
+        """Signature of an alert's content: normalized answer opening plus cited document ids"""
+        answer = ' '.join(query_result['answer'][:200].lower().split())
+        doc_ids = sorted(str(source.get('id', '')) for source in query_result.get('sources', []))
+        return hashlib.sha1(f"{answer}|{','.join(doc_ids)}".encode('utf-8')).hexdigest()
+    
+    def wait_until_sent(self, timeout: float = 30.0) -> bool:
+        """
+        Block until every flushed alert has been delivered (or failed)
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if the dispatch queue drained in time
+        """
+        deadline = time.monotonic() + timeout
+        with self._dispatch_queue.all_tasks_done:
+            while self._dispatch_queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._dispatch_queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def _dispatch_loop(self):
+        """Deliver flushed digests; a burst of digests shares one SMTP login"""
+        while True:
+            pending = self._dispatch_queue.get()
+            with self.smtp_session():
+                while pending is not None:
+                    try:
+                        self._send_pending(pending)
+                    finally:
+                        self._dispatch_queue.task_done()
+                    try:
+                        pending = self._dispatch_queue.get_nowait()
+                    except queue.Empty:
+                        pending = None
+    
+    def _send_pending(self, pending: List[Tuple[AlertRule, Dict, str]]):
+        """Send a batch of alerts as one email and one Slack message"""
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
             # Prepare alert message
-            subject = f"🚨 Trade Alert: {rule.name} [{rule.priority.upper()}]"
+            if len(pending) == 1:
+                rule = pending[0][0]
+                subject = f"🚨 Trade Alert: {rule.name} [{rule.priority.upper()}]"
+                text = f"🚨 Trade Alert: {rule.name}"
+            else:
+                top_priority = min(
+                    (rule.priority for rule, _, _ in pending),
+                    key=priority_rank
+                )
+                subject = f"🚨 Trade Alerts: {len(pending)} rules triggered [{top_priority.upper()}]"
+                text = f"🚨 Trade Alerts: {len(pending)} rules triggered"
             
-            message = f"""
-Trade Intelligence Alert Triggered
-{'=' * 80}
-
-Rule: {rule.name}
-Priority: {rule.priority.upper()}
-Triggered: {timestamp}
-
-Query: {rule.query}
-
-{'=' * 80}
-ANSWER:
-{'=' * 80}
-{query_result['answer']}
-
-{'=' * 80}
-Sources: {query_result['num_sources']} relevant documents found
-{'=' * 80}
-
-This is an automated alert from your Trade Intelligence Monitoring System.
-            """
+            message = ''.join([
+                *(self._format_alert_message(rule, query_result, timestamp)
+                  for rule, query_result, timestamp in pending),
+                _ALERT_FOOTER
+            ])
             
             # Send via email
             if self.email_enabled:
@@ -153,12 +563,28 @@ This is an automated alert from your Trade Intelligence Monitoring System.
             
             # Send via Slack
             if self.slack_enabled:
-                self._send_slack(rule, query_result, timestamp)
+                self._send_slack(text, [
+                    self._slack_attachment(rule, query_result, timestamp)
+                    for rule, query_result, timestamp in pending
+                ])
             
-            logger.info(f"Alert sent successfully for rule: {rule.name}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Alert sent successfully for rules: %s", ', '.join(rule.name for rule, _, _ in pending))
             
         except Exception as e:
-            logger.error(f"Error sending alert: {str(e)}")
+            logger.error("Error sending alert: %s", e)
+    
+    def _format_alert_message(self, rule: AlertRule, query_result: Dict, timestamp: str) -> str:
+        """Plain-text section describing one triggered alert"""
+        return _ALERT_TEMPLATE.format(
+            sep=_SEP,
+            name=rule.name,
+            priority=rule.priority.upper(),
+            timestamp=timestamp,
+            query=rule.query,
+            answer=query_result['answer'],
+            num_sources=query_result['num_sources']
+        )
     
     def _send_email(self, subject: str, body: str):
         """Send email alert"""
@@ -170,135 +596,266 @@ This is an automated alert from your Trade Intelligence Monitoring System.
             
             msg.attach(MIMEText(body, 'plain'))
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped the idle connection; retry once on a fresh one
+                    self._close_smtp()
+                    self._get_smtp().send_message(msg)
+                finally:
+                    if not self._smtp_session_depth:
+                        self._close_smtp()
             
-            logger.info(f"Email alert sent to {len(self.to_emails)} recipients")
+            logger.info("Email alert sent to %d recipients", len(self.to_emails))
             
         except Exception as e:
-            logger.error(f"Error sending email: {str(e)}")
+            logger.error("Error sending email: %s", e)
     
-    def _send_slack(self, rule: AlertRule, query_result: Dict, timestamp: str):
-        """Send Slack alert"""
+    @contextmanager
+    def smtp_session(self):
+        """Reuse one SMTP connection for every email sent inside the block"""
+        with self._smtp_lock:
+            self._smtp_session_depth += 1
+        try:
+            yield self
+        finally:
+            with self._smtp_lock:
+                self._smtp_session_depth -= 1
+                if not self._smtp_session_depth:
+                    self._close_smtp()
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the open SMTP connection if it still answers NOOP, else reconnect"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        """Quit the held SMTP connection, if any"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
+    def _slack_attachment(self, rule: AlertRule, query_result: Dict, timestamp: str) -> Dict:
+        """Slack attachment describing one triggered alert"""
+        # Cut long answers at a word boundary, keeping their line breaks
+        answer = query_result['answer']
+        if len(answer) > 500:
+            answer = answer[:500].rsplit(' ', 1)[0] + ' …'
+        return {
+            "color": _SLACK_COLOR.get(rule.priority, '#ff9900'),
+            "fields": [
+                {
+                    "title": "Rule",
+                    "value": rule.name,
+                    "short": True
+                },
+                {
+                    "title": "Priority",
+                    "value": rule.priority.upper(),
+                    "short": True
+                },
+                {
+                    "title": "Query",
+                    "value": rule.query,
+                    "short": False
+                },
+                {
+                    "title": "Answer",
+                    "value": answer,
+                    "short": False
+                },
+                {
+                    "title": "Sources",
+                    "value": f"{query_result['num_sources']} relevant documents",
+                    "short": True
+                },
+                {
+                    "title": "Timestamp",
+                    "value": timestamp,
+                    "short": True
+                }
+            ],
+            "footer": "Trade Intelligence Monitoring System",
+            "ts": int(datetime.now().timestamp())
+        }
+    
+    def _send_slack(self, text: str, attachments: List[Dict]):
+        """Send Slack alert with one attachment per triggered rule"""
         try:
-            # Map priority to color
-            color_map = {
-                'low': '#36a64f',      # green
-                'medium': '#ff9900',   # orange
-                'high': '#ff0000',     # red
-                'critical': '#8b0000'  # dark red
-            }
-            
-            color = color_map.get(rule.priority, '#ff9900')
-            
             # Create Slack message with rich formatting
             payload = {
-                "text": f"🚨 Trade Alert: {rule.name}",
-                "attachments": [
-                    {
-                        "color": color,
-                        "fields": [
-                            {
-                                "title": "Rule",
-                                "value": rule.name,
-                                "short": True
-                            },
-                            {
-                                "title": "Priority",
-                                "value": rule.priority.upper(),
-                                "short": True
-                            },
-                            {
-                                "title": "Query",
-                                "value": rule.query,
-                                "short": False
-                            },
-                            {
-                                "title": "Answer",
-                                "value": query_result['answer'][:500] + "..." if len(query_result['answer']) > 500 else query_result['answer'],
-                                "short": False
-                            },
-                            {
-                                "title": "Sources",
-                                "value": f"{query_result['num_sources']} relevant documents",
-                                "short": True
-                            },
-                            {
-                                "title": "Timestamp",
-                                "value": timestamp,
-                                "short": True
-                            }
-                        ],
-                        "footer": "Trade Intelligence Monitoring System",
-                        "ts": int(datetime.now().timestamp())
-                    }
-                ]
+                "text": text,
+                "attachments": attachments
             }
             
-            response = requests.post(
+            response = self._http.post(
                 self.slack_webhook_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
+                data=dump_json(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=(3, 10)
             )
             
             if response.status_code == 200:
                 logger.info("Slack alert sent successfully")
             else:
-                logger.error(f"Slack API error: {response.status_code} - {response.text}")
+                logger.error("Slack API error: %s - %s", response.status_code, response.text)
                 
         except Exception as e:
-            logger.error(f"Error sending Slack alert: {str(e)}")
+            logger.error("Error sending Slack alert: %s", e)
 
 class MonitoringSystem:
     """Main monitoring and alerting system"""
     
     def __init__(self, config_path='config.ini', rules_file='alert_rules.json'):
         """Initialize monitoring system"""
+        self.config_path = config_path
         self.config = configparser.ConfigParser()
         self.config.read(config_path)
+        # Compared at the start of each cycle to hot-reload edited config/rules
+        self._config_mtime = file_mtime(config_path)
+        self._rules_mtime: Optional[int] = None
         
         self.rules_file = rules_file
         self.rules: List[AlertRule] = []
+        # Circuit breaker per rule_id: (consecutive failures, monotonic time the pause ends)
+        self._breakers: Dict[str, Tuple[int, float]] = {}
+        # Guards rule list mutation/persistence and alert history writes
+        self._lock = threading.RLock()
+        # Set when rules are added/removed; per-rule edits are tracked by AlertRule._dirty
+        self._rules_changed = False
+        self._rules_digest: Optional[bytes] = None
         self.load_rules()
         
         self.query_interface = ProgrammaticQueryInterface()
         self.notifier = AlertNotifier(self.config)
         
+        # Query results are reused until the ETL manifest (i.e. the indexed corpus) changes
+        self.query_cache = SmartRAGCache(
+            ttl_seconds=self.config.getfloat('MONITORING', 'cache_ttl_seconds', fallback=3600.0),
+            max_entries=self.config.getint('MONITORING', 'cache_max_entries', fallback=512)
+        )
+        self.corpus_stamp_path = self.config.get('ETL', 'manifest_path', fallback='data/manifest.db')
+        # Paraphrased rule queries share an answer when their retrieved evidence matches
+        self.semantic_cache = None
+        if self.config.getboolean('MONITORING', 'semantic_cache', fallback=True):
+            self.semantic_cache = SemanticQueryCache(
+                similarity_threshold=self.config.getfloat('MONITORING', 'semantic_similarity_threshold', fallback=0.95),
+                min_overlap=self.config.getfloat('MONITORING', 'semantic_min_overlap', fallback=0.7),
+                ttl_seconds=self.query_cache.ttl_seconds
+            )
+        self._apply_settings()
+        
         # Alert history
-        self.alert_history_file = 'data/alert_history.json'
+        self.alert_history_file = 'data/alert_history.jsonl'
+        # Alerts kept after a trim; trimming starts once the file grows 20% past this
+        self.max_history = 1000
+        self._history_lines: Optional[int] = None
         os.makedirs('data', exist_ok=True)
         
-        logger.info(f"Monitoring system initialized with {len(self.rules)} rules")
+        logger.info("Monitoring system initialized with %d rules", len(self.rules))
+    
+    def _apply_settings(self):
+        """Read the per-cycle settings that can change without a restart"""
+        # Rules whose queries run concurrently in a cycle
+        self.max_workers = self.config.getint('MONITORING', 'max_workers', fallback=8)
+        # Rules not started within this many seconds are deferred to the next cycle (0 = no limit)
+        self.cycle_budget_seconds = self.config.getfloat('MONITORING', 'cycle_budget_seconds', fallback=0.0)
+        # A query running longer than this counts as a failure (0 = no limit)
+        self.query_timeout_seconds = self.config.getfloat('MONITORING', 'query_timeout_seconds', fallback=120.0)
+        # After this many consecutive failures a rule is paused for cooldown_seconds
+        self.failure_threshold = self.config.getint('MONITORING', 'failure_threshold', fallback=3)
+        self.cooldown_seconds = self.config.getfloat('MONITORING', 'cooldown_seconds', fallback=300.0)
+    
+    def _maybe_reload(self):
+        """Reload the config file and rules file if either changed on disk since last read"""
+        config_mtime = file_mtime(self.config_path)
+        if config_mtime != self._config_mtime:
+            config = configparser.ConfigParser()
+            config.read(self.config_path)
+            self.config = config
+            self._config_mtime = config_mtime
+            # Notifier and cache settings still require a restart
+            self._apply_settings()
+            logger.info("Configuration changed on disk, reloaded monitoring settings")
+        
+        rules_mtime = file_mtime(self.rules_file)
+        if rules_mtime is not None and rules_mtime != self._rules_mtime:
+            try:
+                rules = self._read_rules_file()
+            except Exception as e:
+                # A half-saved edit shouldn't replace working rules
+                logger.error("Error reloading rules, keeping current rules: %s", e)
+            else:
+                with self._lock:
+                    self.rules = rules
+                logger.info("Rules file changed on disk, reloaded %d alert rules", len(rules))
+            self._rules_mtime = rules_mtime
     
     def load_rules(self):
         """Load alert rules from JSON file"""
         try:
             if os.path.exists(self.rules_file):
-                with open(self.rules_file, 'r') as f:
-                    rules_data = json.load(f)
-                
-                self.rules = [AlertRule.from_dict(rule) for rule in rules_data]
-                logger.info(f"Loaded {len(self.rules)} alert rules")
+                self._rules_mtime = file_mtime(self.rules_file)
+                self.rules = self._read_rules_file()
+                logger.info("Loaded %d alert rules", len(self.rules))
             else:
                 # Create default rules if file doesn't exist
                 self._create_default_rules()
                 self.save_rules()
                 
         except Exception as e:
-            logger.error(f"Error loading rules: {str(e)}")
+            logger.error("Error loading rules: %s", e)
             self._create_default_rules()
     
+    def _read_rules_file(self) -> List[AlertRule]:
+        """Parse the rules file"""
+        with open(self.rules_file, 'rb') as f:
+            rules_data = load_json(f.read())
+        return [AlertRule.from_dict(rule) for rule in rules_data]
+    
     def save_rules(self):
-        """Save alert rules to JSON file"""
+        """Save alert rules to JSON file, skipping the write if nothing changed"""
         try:
-            rules_data = [rule.to_dict() for rule in self.rules]
-            with open(self.rules_file, 'w') as f:
-                json.dump(rules_data, f, indent=2)
-            logger.info("Alert rules saved")
+            with self._lock:
+                if not self._rules_changed and not any(rule._dirty for rule in self.rules):
+                    return
+                
+                rules_data = [rule.to_dict() for rule in self.rules]
+                content = dump_json_pretty(rules_data)
+                digest = hashlib.sha1(content).digest()
+                if digest != self._rules_digest:
+                    with open(self.rules_file, 'wb') as f:
+                        f.write(content)
+                    self._rules_digest = digest
+                    # Our own write is not an external edit to reload
+                    self._rules_mtime = file_mtime(self.rules_file)
+                    logger.info("Alert rules saved")
+                
+                for rule in self.rules:
+                    rule._dirty = False
+                self._rules_changed = False
         except Exception as e:
-            logger.error(f"Error saving rules: {str(e)}")
+            logger.error("Error saving rules: %s", e)
     
     def _create_default_rules(self):
         """Create default monitoring rules"""
@@ -345,88 +902,210 @@ class MonitoringSystem:
     
     def add_rule(self, rule: AlertRule):
         """Add a new alert rule"""
-        self.rules.append(rule)
-        self.save_rules()
-        logger.info(f"Added new rule: {rule.name}")
+        with self._lock:
+            self.rules.append(rule)
+            self._rules_changed = True
+            self.save_rules()
+        logger.info("Added new rule: %s", rule.name, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
     
     def remove_rule(self, rule_id: str):
         """Remove an alert rule"""
-        self.rules = [r for r in self.rules if r.rule_id != rule_id]
-        self.save_rules()
-        logger.info(f"Removed rule: {rule_id}")
+        with self._lock:
+            self.rules = [r for r in self.rules if r.rule_id != rule_id]
+            self._rules_changed = True
+            self.save_rules()
+        logger.info("Removed rule: %s", rule_id, extra={'rule_id': rule_id})
     
     def run_monitoring_cycle(self):
         """Execute one monitoring cycle - check all rules"""
-        logger.info("=" * 80)
+        logger.info(_SEP)
         logger.info("Starting Monitoring Cycle")
-        logger.info("=" * 80)
+        logger.info(_SEP)
+        
+        self._maybe_reload()
         
         alerts_triggered = 0
+        deferred = 0
         
-        for rule in self.rules:
-            if not rule.enabled:
-                logger.info(f"Skipping disabled rule: {rule.name}")
-                continue
-            
-            logger.info(f"\nChecking rule: {rule.name}")
-            logger.info(f"Query: {rule.query}")
-            
-            try:
-                # Execute query
-                result = self.query_interface.execute_query(rule.query, return_sources=False)
-                
-                # Check trigger condition
-                should_alert = self._check_trigger_condition(rule, result)
+        with self._lock:
+            rules = list(self.rules)
+        # Most important rules are submitted first so a slow backend defers the least critical
+        enabled_rules = sorted(
+            (rule for rule in rules if rule.enabled and not self._circuit_open(rule)),
+            key=lambda rule: priority_rank(rule.priority)
+        )
+        if len(enabled_rules) < len(rules):
+            logger.info("Skipping %d disabled or paused rules", len(rules) - len(enabled_rules))
+        
+        deadline = time.monotonic() + self.cycle_budget_seconds if self.cycle_budget_seconds > 0 else None
+        
+        # One matcher over the indicators and every rule's keywords, so each answer
+        # is scanned once no matter how many rules evaluate it
+        matcher = phrase_matcher(INDICATOR_PHRASES.union(*(rule.keywords_lower for rule in enabled_rules)))
+        
+        if enabled_rules:
+            # Queries are network/LLM bound, so rules are checked concurrently and
+            # alerts are handled as their checks complete
+            with ThreadPoolExecutor(max_workers=min(len(enabled_rules), self.max_workers)) as executor:
+                futures = {executor.submit(self._check_one, rule, deadline, matcher): rule for rule in enabled_rules}
+                for future in as_completed(futures):
+                    rule = futures[future]
+                    try:
+                        outcome = future.result()
+                        if outcome is None:
+                            deferred += 1
+                            continue
+                        _, full_result, should_alert = outcome
+                        self._record_success(rule)
+                        
+                        if should_alert:
+                            logger.info("✓ Alert condition met for rule: %s", rule.name, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+                            
+                            # Queue alert for the end-of-cycle digest
+                            self.notifier.queue_alert(rule, full_result)
+                            
+                            # Update rule
+                            rule.last_triggered = datetime.now().isoformat()
+                            
+                            # Save to history
+                            self._save_alert_history(rule, full_result)
+                            
+                            alerts_triggered += 1
+                        else:
+                            logger.info("✗ No alert triggered for rule: %s", rule.name, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+                            
+                    except Exception as e:
+                        logger.error("Error checking rule %s: %s", rule.name, str(e) or type(e).__name__,
+                                     extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+                        self._record_failure(rule)
                 
-                if should_alert:
-                    logger.info(f"✓ Alert condition met for rule: {rule.name}")
-                    
-                    # Get full result with sources for alert
-                    full_result = self.query_interface.execute_query(rule.query, return_sources=True)
-                    
-                    # Send alert
-                    self.notifier.send_alert(rule, full_result)
-                    
-                    # Update rule
-                    rule.last_triggered = datetime.now().isoformat()
-                    
-                    # Save to history
-                    self._save_alert_history(rule, full_result)
-                    
-                    alerts_triggered += 1
-                else:
-                    logger.info(f"✗ No alert triggered for rule: {rule.name}")
-                    
-            except Exception as e:
-                logger.error(f"Error checking rule {rule.name}: {str(e)}")
+                # One email and one Slack message for everything that fired, sent in the background
+                self.notifier.flush()
+        
+        if deferred:
+            logger.warning("Cycle budget of %ss exceeded, deferred %d rules", self.cycle_budget_seconds, deferred)
         
         # Save updated rules
         self.save_rules()
         
-        logger.info("\n" + "=" * 80)
-        logger.info(f"Monitoring Cycle Complete - {alerts_triggered} alerts triggered")
-        logger.info("=" * 80)
+        # The summary takes the cache lock for its stats, so skip it when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n%s", _SEP)
+            logger.info("Monitoring Cycle Complete - %d alerts triggered", alerts_triggered)
+            logger.info("Query cache: %s", self.query_cache.stats())
+            if self.semantic_cache is not None:
+                logger.info("Semantic cache hits: %d", self.semantic_cache.hits)
+            logger.info(_SEP)
     
-    def _check_trigger_condition(self, rule: AlertRule, result: Dict) -> bool:
-        """Check if alert should be triggered based on rule condition"""
-        answer = result['answer'].lower()
+    def _check_one(self, rule: AlertRule, deadline: Optional[float] = None,
+                   matcher: Optional[PhraseMatcher] = None) -> Optional[Tuple[AlertRule, Dict, bool]]:
+        """
+        Run one rule's query and evaluate its trigger condition
+        
+        Args:
+            rule: Enabled alert rule to check
+            deadline: time.monotonic() value after which the check is deferred
+            matcher: Cycle-wide phrase matcher covering this rule's keywords
+        
+        Returns:
+            Tuple of (rule, query result with sources, whether to alert),
+            or None if the cycle budget ran out before the check started
+        """
+        if deadline is not None and time.monotonic() > deadline:
+            return None
+        
+        logger.info("\nChecking rule: %s", rule.name, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+        logger.info("Query: %s", rule.query, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+        
+        # Execute query once, with sources, so the alert reuses the checked answer;
+        # a hung LLM/vector backend must not stall the whole cycle
+        full_result = call_with_timeout(self._execute_cached, self.query_timeout_seconds or None, rule.query)
+        if full_result.get('error'):
+            raise RuntimeError(full_result['error'])
+        
+        # Check trigger condition
+        return rule, full_result, self._check_trigger_condition(rule, full_result, matcher)
+    
+    def _circuit_open(self, rule: AlertRule) -> bool:
+        """Whether the rule is paused after repeated failures"""
+        failures, paused_until = self._breakers.get(rule.rule_id, (0, 0.0))
+        return failures >= self.failure_threshold and time.monotonic() < paused_until
+    
+    def _record_success(self, rule: AlertRule):
+        """Close the rule's circuit after a successful check"""
+        failures, _ = self._breakers.pop(rule.rule_id, (0, 0.0))
+        if failures >= self.failure_threshold:
+            logger.info("Rule %s recovered, resuming checks", rule.name, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+    
+    def _record_failure(self, rule: AlertRule):
+        """Count a failed check; open the circuit once the threshold is reached"""
+        failures = self._breakers.get(rule.rule_id, (0, 0.0))[0] + 1
+        paused_until = 0.0
+        if failures >= self.failure_threshold:
+            paused_until = time.monotonic() + self.cooldown_seconds
+            logger.warning("Rule %s failed %d times in a row, pausing it for %ss",
+                           rule.name, failures, self.cooldown_seconds, extra={'rule_id': rule.rule_id, 'priority': rule.priority})
+        self._breakers[rule.rule_id] = (failures, paused_until)
+    
+    def _corpus_version(self) -> str:
+        """Version stamp of the indexed corpus (the ETL manifest's modification time)"""
+        try:
+            return str(os.stat(self.corpus_stamp_path).st_mtime_ns)
+        except OSError:
+            return ''
+    
+    def _execute_cached(self, query: str) -> Dict:
+        """Execute a query with sources, reusing a cached result for the same corpus version"""
+        corpus_version = self._corpus_version()
+        key = SmartRAGCache.make_key(query, corpus_version)
+        result = self.query_cache.get(key)
+        if result is not None:
+            logger.info("Using cached query result")
+            return result
         
+        if self.semantic_cache is None:
+            result = self.query_interface.execute_query(query, return_sources=True)
+            # Failed queries come back as an error answer without sources; don't pin those
+            if result.get('num_sources'):
+                self.query_cache.put(key, result)
+            return result
+        
+        # Embedding + retrieval only; the LLM is skipped on a semantic hit, and on
+        # a miss the answer is generated from these same documents
+        query_bundle, nodes = self.query_interface.retrieve(query)
+        doc_ids = [node.node.node_id for node in nodes]
+        result = self.semantic_cache.get(query_bundle.embedding, doc_ids, corpus_version)
+        if result is not None:
+            logger.info("Using semantically equivalent cached query result")
+            result = dict(result, question=query)
+            self.query_cache.put(key, result)
+            return result
+        
+        result = self.query_interface.execute_retrieved(query_bundle, nodes, return_sources=True)
+        if result.get('num_sources'):
+            self.query_cache.put(key, result)
+            self.semantic_cache.put(query_bundle.embedding, doc_ids, result, corpus_version)
+        return result
+    
+    def _check_trigger_condition(self, rule: AlertRule, result: Dict,
+                                 matcher: Optional[PhraseMatcher] = None) -> bool:
+        """Check if alert should be triggered based on rule condition"""
         if rule.trigger_condition == 'always':
             return True
         
-        elif rule.trigger_condition == 'data_found':
+        answer = result['answer'].lower()
+        if matcher is None:
+            matcher = phrase_matcher(INDICATOR_PHRASES | rule.keywords_lower)
+        hits = matcher.find_all(answer)
+        
+        if rule.trigger_condition == 'data_found':
             # Check if answer indicates data was found
-            positive_indicators = ['yes', 'found', 'detected', 'identified', 'new', 
-                                  'shipment', 'buyer', 'supplier', 'increased', 'decreased']
-            negative_indicators = ['no', 'none', 'not found', 'no data', 'no records', 
-                                  'no shipments', 'no buyers', 'no suppliers']
-            
             # If explicitly negative, don't trigger
-            if any(neg in answer for neg in negative_indicators):
+            if not hits.isdisjoint(NEGATIVE_INDICATORS):
                 return False
             
             # If has positive indicators or substantial content, trigger
-            if any(pos in answer for pos in positive_indicators):
+            if not hits.isdisjoint(POSITIVE_INDICATORS):
                 return True
             
             # If answer is substantial (>150 chars), consider it data found
@@ -434,20 +1113,13 @@ class MonitoringSystem:
         
         elif rule.trigger_condition == 'keyword_match':
             # Check for specific keywords
-            return any(keyword.lower() in answer for keyword in rule.keywords)
+            return not hits.isdisjoint(rule.keywords_lower)
         
         return False
     
     def _save_alert_history(self, rule: AlertRule, result: Dict):
-        """Save triggered alert to history"""
+        """Append triggered alert to the JSON-lines history"""
         try:
-            # Load existing history
-            history = []
-            if os.path.exists(self.alert_history_file):
-                with open(self.alert_history_file, 'r') as f:
-                    history = json.load(f)
-            
-            # Add new alert
             alert_record = {
                 'timestamp': datetime.now().isoformat(),
                 'rule_id': rule.rule_id,
@@ -457,26 +1129,79 @@ class MonitoringSystem:
                 'answer': result['answer'],
                 'num_sources': result['num_sources']
             }
-            history.append(alert_record)
-            
-            # Keep only last 1000 alerts
-            if len(history) > 1000:
-                history = history[-1000:]
             
-            # Save
-            with open(self.alert_history_file, 'w') as f:
-                json.dump(history, f, indent=2)
+            with self._lock:
+                if self._history_lines is None:
+                    self._history_lines = sum(1 for _ in self.load_history())
+                
+                with open(self.alert_history_file, 'a') as f:
+                    f.write(json.dumps(alert_record) + '\n')
+                self._history_lines += 1
+                
+                self._trim_history_if_needed()
                 
         except Exception as e:
-            logger.error(f"Error saving alert history: {str(e)}")
+            logger.error("Error saving alert history: %s", e)
+    
+    def _trim_history_if_needed(self):
+        """Keep only the last max_history alerts once the file has grown well past it"""
+        if self._history_lines <= self.max_history * 1.2:
+            return
+        
+        with open(self.alert_history_file, 'r') as f:
+            recent = deque(f, maxlen=self.max_history)
+        
+        tmp_path = self.alert_history_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.writelines(recent)
+        os.replace(tmp_path, self.alert_history_file)
+        self._history_lines = len(recent)
+    
+    def load_history(self) -> Iterator[Dict]:
+        """
+        Iterate over saved alerts, oldest first
+        
+        Returns:
+            Iterator of alert history records
+        """
+        if not os.path.exists(self.alert_history_file):
+            return
+        with open(self.alert_history_file, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
 def main():
-    """Main entry point for monitoring script (to be run as cron job)"""
+    """
+    Main entry point for monitoring script
+    
+    Runs a single cycle (for cron) by default. With --interval MINUTES it stays
+    resident and runs a cycle every MINUTES, keeping the RAG components and caches
+    loaded and hot-reloading config/rules when their files change.
+    """
+    interval_minutes = None
+    if len(sys.argv) > 2 and sys.argv[1] == '--interval':
+        interval_minutes = float(sys.argv[2])
+    
     try:
         monitoring = MonitoringSystem()
-        monitoring.run_monitoring_cycle()
+        if interval_minutes is None:
+            monitoring.run_monitoring_cycle()
+        else:
+            logger.info("Running monitoring cycle every %s minutes", interval_minutes)
+            next_run = time.monotonic()
+            try:
+                while True:
+                    monitoring.run_monitoring_cycle()
+                    next_run += interval_minutes * 60
+                    time.sleep(max(0.0, next_run - time.monotonic()))
+            except KeyboardInterrupt:
+                logger.info("Monitoring stopped")
+        # Alerts are delivered in the background; let them go out before exiting
+        if not monitoring.notifier.wait_until_sent(timeout=60):
+            logger.warning("Timed out waiting for alerts to be delivered")
     except Exception as e:
-        logger.critical(f"Monitoring system failed: {str(e)}", exc_info=True)
+        logger.critical("Monitoring system failed: %s", e, exc_info=True)
         raise
 
 if __name__ == "__main__":
@@ -7,26 +7,70 @@ Provides unified interface for all system operations
 import os
 import sys
 import argparse
+import atexit
+import importlib
 import logging
+import logging.handlers
+import queue
+import shutil
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import subprocess
 
+from trade_intel_common import load_config
+
+# Configure logging. Callers only enqueue records; a listener thread does the console I/O
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
 class TradeIntelligenceOrchestrator:
     """Master orchestrator for all platform operations"""
     
-    def __init__(self):
+    # Pipeline stages as (step name, component, components it depends on), in
+    # dependency order; a stage whose dependencies did not all succeed is skipped
+    PIPELINE_STAGES = [
+        ('Data Ingestion', 'ingestion', ()),
+        ('ETL & Vectorization', 'etl', ('ingestion',)),
+        ('Monitoring & Alerts', 'monitoring', ('etl',))
+    ]
+    
+    # Bytes read per step when tailing a log backwards from its end
+    TAIL_BLOCK_SIZE = 8192
+    # Buffer for copying file bodies into backup archives (tarfile defaults to 16 KiB)
+    BACKUP_COPY_BUFSIZE = 1024 * 1024
+    
+    def __init__(self, isolate: bool = False):
+        """
+        Args:
+            isolate: Run each component in its own Python subprocess instead of
+                importing it into this process
+        """
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.isolate = isolate
+        # Component module names (scripts are <module>.py in base_dir)
         self.components = {
-            'ingestion': 'component1_data_ingestion.py',
-            'etl': 'component2_etl_vectorization.py',
-            'query': 'component3_rag_query.py',
-            'monitoring': 'component4_monitoring_alerts.py'
+            'ingestion': 'component1_data_ingestion',
+            'etl': 'component2_etl_vectorization',
+            'query': 'component3_rag_query',
+            'monitoring': 'component4_monitoring_alerts'
+        }
+        self.log_files = {
+            'ingestion': 'logs/data_ingestion.log',
+            'etl': 'logs/etl_vectorization.log',
+            'query': 'logs/rag_query.log',
+            'monitoring': 'logs/monitoring_alerts.log'
         }
         
     def run_full_pipeline(self):
@@ -35,13 +79,15 @@ class TradeIntelligenceOrchestrator:
         logger.info("RUNNING FULL TRADE INTELLIGENCE PIPELINE")
         logger.info("="*80)
         
-        steps = [
-            ('Data Ingestion', 'ingestion'),
-            ('ETL & Vectorization', 'etl'),
-            ('Monitoring & Alerts', 'monitoring')
-        ]
-        
-        for step_name, component in steps:
+        # Stages run one at a time on this thread, so Ctrl-C stops the pipeline
+        # instead of letting later stages start
+        succeeded = set()
+        skipped = []
+        for step_name, component, depends_on in self.PIPELINE_STAGES:
+            if not succeeded.issuperset(depends_on):
+                skipped.append(step_name)
+                continue
+            
             logger.info(f"\n{'='*80}")
             logger.info(f"Step: {step_name}")
             logger.info(f"{'='*80}\n")
@@ -50,7 +96,13 @@ class TradeIntelligenceOrchestrator:
             
             if not success:
                 logger.error(f"Pipeline failed at step: {step_name}")
-                return False
+                continue
+            succeeded.add(component)
+        
+        if len(succeeded) < len(self.PIPELINE_STAGES):
+            if skipped:
+                logger.error(f"Skipped steps: {', '.join(skipped)}")
+            return False
         
         logger.info("\n" + "="*80)
         logger.info("✅ FULL PIPELINE COMPLETED SUCCESSFULLY")
@@ -70,7 +122,7 @@ class TradeIntelligenceOrchestrator:
     def run_query_interactive(self):
         """Launch interactive query interface"""
         logger.info("Launching interactive query interface...")
-        script = os.path.join(self.base_dir, self.components['query'])
+        script = os.path.join(self.base_dir, self.components['query'] + '.py')
         subprocess.run([sys.executable, script, '--interactive'])
     
     def run_monitoring(self):
@@ -95,12 +147,16 @@ class TradeIntelligenceOrchestrator:
         passed = 0
         failed = 0
         
-        for test in tests:
-            try:
-                test()
+        # Tests are independent (imports, file checks, connection probes), so
+        # they run concurrently; map() keeps the results in test order
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            results = list(executor.map(self._run_test, tests))
+        
+        for name, success, error in results:
+            if success:
                 passed += 1
-            except Exception as e:
-                logger.error(f"Test failed: {str(e)}")
+            else:
+                logger.error("Test failed: %s: %s", name, error)
                 failed += 1
         
         logger.info("\n" + "="*80)
@@ -150,12 +206,7 @@ class TradeIntelligenceOrchestrator:
     
     def view_logs(self, component=None, lines=50):
         """Display recent logs"""
-        log_files = {
-            'ingestion': 'logs/data_ingestion.log',
-            'etl': 'logs/etl_vectorization.log',
-            'query': 'logs/rag_query.log',
-            'monitoring': 'logs/monitoring_alerts.log'
-        }
+        log_files = self.log_files
         
         if component:
             log_file = log_files.get(component)
@@ -184,19 +235,37 @@ class TradeIntelligenceOrchestrator:
             'data/processed'
         ]
         
-        import tarfile
-        
         logger.info(f"Creating backup: {backup_file}")
         
-        with tarfile.open(backup_file, "w:gz") as tar:
-            for item in files_to_backup:
-                if os.path.exists(item):
-                    tar.add(item)
-                    logger.info(f"  Added: {item}")
+        pigz = shutil.which('pigz')
+        if pigz:
+            # Stream the (uncompressed) tar into pigz, which gzips on every core
+            with open(backup_file, 'wb') as out:
+                proc = subprocess.Popen([pigz, '-p', str(os.cpu_count() or 1)],
+                                        stdin=subprocess.PIPE, stdout=out)
+                try:
+                    with tarfile.open(fileobj=proc.stdin, mode='w|', bufsize=self.BACKUP_COPY_BUFSIZE,
+                                      copybufsize=self.BACKUP_COPY_BUFSIZE) as tar:
+                        self._add_to_backup(tar, files_to_backup)
+                finally:
+                    proc.stdin.close()
+                    returncode = proc.wait()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, pigz)
+        else:
+            with tarfile.open(backup_file, "w:gz", copybufsize=self.BACKUP_COPY_BUFSIZE) as tar:
+                self._add_to_backup(tar, files_to_backup)
         
         logger.info(f"✅ Backup created: {backup_file}")
         return backup_file
     
+    def _add_to_backup(self, tar, items):
+        """Add the existing files/directories among items to an open tar archive"""
+        for item in items:
+            if os.path.exists(item):
+                tar.add(item)
+                logger.info(f"  Added: {item}")
+    
     def generate_report(self):
         """Generate system status report"""
         logger.info("="*80)
@@ -221,8 +290,8 @@ class TradeIntelligenceOrchestrator:
         
         # Check data files
         print("\n📁 Data Files:")
-        raw_files = len(os.listdir('data/raw')) if os.path.exists('data/raw') else 0
-        processed_files = len(os.listdir('data/processed')) if os.path.exists('data/processed') else 0
+        raw_files = self._count_entries('data/raw')
+        processed_files = self._count_entries('data/processed')
         print(f"  Raw files: {raw_files}")
         print(f"  Processed files: {processed_files}")
         
@@ -240,24 +309,50 @@ class TradeIntelligenceOrchestrator:
         # Check logs
         print("\n📝 Recent Activity:")
         log_files = ['data_ingestion.log', 'etl_vectorization.log', 'monitoring_alerts.log']
+        try:
+            with os.scandir('logs') as it:
+                log_entries = {entry.name: entry for entry in it}
+        except OSError:
+            log_entries = {}
         for log_file in log_files:
-            log_path = os.path.join('logs', log_file)
-            if os.path.exists(log_path):
-                mtime = datetime.fromtimestamp(os.path.getmtime(log_path))
+            entry = log_entries.get(log_file)
+            if entry is not None:
+                mtime = datetime.fromtimestamp(entry.stat().st_mtime)
                 print(f"  {log_file}: Last updated {mtime.strftime('%Y-%m-%d %H:%M')}")
         
         print("\n" + "="*80)
     
     # Helper methods
     
+    @staticmethod
+    def _run_test(test):
+        """Run one test, returning (name, passed, error) instead of raising"""
+        try:
+            test()
+            return test.__name__, True, None
+        except Exception as e:
+            return test.__name__, False, e
+    
+    @staticmethod
+    def _count_entries(dir_path):
+        """Number of entries in a directory (0 if it doesn't exist), from one scandir pass"""
+        try:
+            with os.scandir(dir_path) as it:
+                return sum(1 for _ in it)
+        except OSError:
+            return 0
+    
     def _run_component(self, component_name):
-        """Run a specific component script"""
-        script = os.path.join(self.base_dir, self.components[component_name])
+        """Run a specific component, in-process unless isolation was requested"""
+        script = os.path.join(self.base_dir, self.components[component_name] + '.py')
         
         if not os.path.exists(script):
             logger.error(f"Script not found: {script}")
             return False
         
+        if not self.isolate:
+            return self._run_component_in_process(component_name)
+        
         try:
             result = subprocess.run(
                 [sys.executable, script],
@@ -270,13 +365,45 @@ class TradeIntelligenceOrchestrator:
             logger.error(f"Component failed with exit code {e.returncode}")
             return False
     
+    def _run_component_in_process(self, component_name):
+        """
+        Import a component and call its main() in this process
+        
+        Stages share one interpreter, so heavy imports (llama_index, pinecone,
+        openai) are paid once per pipeline instead of once per stage.
+        """
+        module_name = self.components[component_name]
+        
+        # The component's logging.basicConfig is a no-op once this process has
+        # configured logging, so attach its log file for the duration of the run
+        log_handler = logging.FileHandler(self.log_files[component_name], delay=True)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        component_logger = logging.getLogger(module_name)
+        component_logger.addHandler(log_handler)
+        
+        try:
+            if self.base_dir not in sys.path:
+                sys.path.insert(0, self.base_dir)
+            module = importlib.import_module(module_name)
+            module.main()
+            return True
+        except SystemExit as e:
+            if e.code in (None, 0):
+                return True
+            logger.error(f"Component failed with exit code {e.code}")
+            return False
+        except Exception as e:
+            logger.error(f"Component failed: {str(e)}")
+            return False
+        finally:
+            component_logger.removeHandler(log_handler)
+            log_handler.close()
+    
     def _test_configuration(self):
         """Test configuration file"""
         logger.info("Testing configuration...")
-        import configparser
         
-        config = configparser.ConfigParser()
-        config.read('config.ini')
+        config = load_config('config.ini')
         
         required_sections = ['COMTRADE', 'BL_DATA', 'EMBEDDINGS', 'VECTOR_DB']
         for section in required_sections:
@@ -327,12 +454,26 @@ class TradeIntelligenceOrchestrator:
         logger.info("  ✓ RAG system test (skipped)")
     
     def _tail_file(self, filepath, lines):
-        """Display last N lines of a file"""
+        """Display last N lines of a file, reading blocks backwards from its end"""
+        if lines <= 0:
+            return
         try:
-            with open(filepath, 'r') as f:
-                all_lines = f.readlines()
-                for line in all_lines[-lines:]:
-                    print(line.rstrip())
+            with open(filepath, 'rb') as f:
+                pos = f.seek(0, os.SEEK_END)
+                blocks = deque()
+                newlines = 0
+                # One newline more than requested, since the last line normally ends in one
+                while pos > 0 and newlines <= lines:
+                    size = min(self.TAIL_BLOCK_SIZE, pos)
+                    pos -= size
+                    f.seek(pos)
+                    block = f.read(size)
+                    blocks.appendleft(block)
+                    newlines += block.count(b'\n')
+            
+            tail = b''.join(blocks).decode('utf-8', errors='replace').splitlines()
+            for line in tail[-lines:]:
+                print(line.rstrip())
         except Exception as e:
             logger.error(f"Error reading file: {str(e)}")
 
@@ -381,10 +522,14 @@ def main():
         '--report', action='store_true',
         help='Generate status report'
     )
+    parser.add_argument(
+        '--isolate', action='store_true',
+        help='Run each component in a separate Python process'
+    )
     
     args = parser.parse_args()
     
-    orchestrator = TradeIntelligenceOrchestrator()
+    orchestrator = TradeIntelligenceOrchestrator(isolate=args.isolate)
     
     # Execute requested operation
     if args.setup:
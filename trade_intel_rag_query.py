@@ -4,12 +4,23 @@ RAG application using LlamaIndex/LangChain to query trade intelligence data
 """
 
 import os
+import re
+import json
+import atexit
+import asyncio
+import functools
 import logging
-from typing import List, Dict, Optional
-import configparser
+import logging.handlers
+import queue
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
 
 # LLM frameworks
-from llama_index.core import VectorStoreIndex, Settings, StorageContext
+from llama_index.core import QueryBundle, VectorStoreIndex, Settings, StorageContext
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import NodeWithScore
 from llama_index.vector_stores.pinecone import PineconeVectorStore
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
@@ -19,26 +30,124 @@ from llama_index.core.response_synthesizers import ResponseMode
 
 from pinecone import Pinecone
 
+from trade_intel_common import TextStore, load_config
+
+# Configure logging. Callers only enqueue records; a listener thread formats
+# them and does the I/O, with file writes batched until an error or 512 records.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_file_handler = logging.FileHandler('logs/rag_query.log', delay=True)
+_log_handlers = [
+    logging.handlers.MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=_log_file_handler),
+    logging.StreamHandler()
+]
+for _handler in (_log_file_handler, *_log_handlers):
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers,
+                                               respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/rag_query.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=256)
+def _compile_phrases(phrases: Tuple[str, ...]) -> re.Pattern:
+    """
+    One case-insensitive alternation finding any of the phrases as a substring,
+    so answers are scanned as-is instead of through a lowercased copy
+    """
+    return re.compile('|'.join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True)),
+                      re.IGNORECASE)
+
+# Answer phrases used by check_condition when no keywords are given
+_POSITIVE_PATTERN = _compile_phrases(('yes', 'found', 'detected', 'identified', 'new', 'increased'))
+_NEGATIVE_PATTERN = _compile_phrases(('no', 'none', 'not found', 'no data', 'no records'))
+
+# Example questions offered by the interactive CLI
+EXAMPLE_QUESTIONS = [
+    "Who are the top 3 new buyers for HS code 851712 in the last month?",
+    "Show me all shipments from 'Supplier Inc.' to any buyers in Germany.",
+    "What is the average monthly import value for HS code 950300?",
+    "List all new suppliers that shipped to 'MyCompetitor LLC' in the last week.",
+    "Which countries imported the most electronics (HS 8517) last month?",
+    "Show me recent shipments of medical devices from China to the USA.",
+    "What is the trend in import volumes for HS code 851712 over the last 3 months?",
+]
+
+def load_static_embeddings(path: str, model: str) -> Dict[str, List[float]]:
+    """
+    Load precomputed question embeddings written by save_static_embeddings
+    
+    Args:
+        path: .npz file path
+        model: Embedding model in use; embeddings from another model are ignored
+    
+    Returns:
+        Dictionary mapping question text to its embedding (empty if unavailable)
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with np.load(path) as data:
+            if str(data['model']) != model:
+                logger.warning(f"Ignoring static embeddings in {path}: built for {data['model']}, not {model}")
+                return {}
+            return dict(zip(data['questions'].tolist(), data['vectors'].tolist()))
+    except Exception as e:
+        logger.error(f"Error loading static embeddings: {str(e)}")
+        return {}
+
+def save_static_embeddings(path: str, model: str, questions: List[str], vectors: List[List[float]]):
+    """Write question embeddings as an .npz with the questions, a float32 matrix and the model name"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, model=np.array(model), questions=np.array(questions),
+             vectors=np.asarray(vectors, dtype=np.float32))
+    os.replace(tmp_path, path)
+
+class SideStoreTextFiller(BaseNodePostprocessor):
+    """
+    Fill retrieved node text from the ETL's local side store
+    
+    With store_text_in_metadata = false the ETL writes an empty 'text' to
+    Pinecone and keeps the chunk text in a TextStore keyed by vector id.
+    """
+    
+    _text_store: TextStore = PrivateAttr()
+    
+    def __init__(self, text_store: TextStore, **kwargs):
+        super().__init__(**kwargs)
+        self._text_store = text_store
+    
+    @classmethod
+    def class_name(cls) -> str:
+        return "SideStoreTextFiller"
+    
+    def _postprocess_nodes(self, nodes: List[NodeWithScore],
+                           query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        texts = self._text_store.get_many([node.node.node_id for node in nodes])
+        for node in nodes:
+            text = texts.get(node.node.node_id)
+            if text is not None:
+                node.node.set_content(text)
+        return nodes
+
 class TradeIntelligenceRAG:
     """
     RAG-based query interface for trade intelligence platform
     Uses LlamaIndex for retrieval and OpenAI for generation
     """
     
+    # Distinct (top_k, filters) query engines kept for reuse
+    ENGINE_CACHE_SIZE = 32
+    
     def __init__(self, config_path='config.ini'):
         """Initialize RAG system with configuration"""
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
+        self.config = load_config(config_path)
         
         # Initialize embedding model
         openai_api_key = self.config.get('EMBEDDINGS', 'openai_api_key')
@@ -48,6 +157,17 @@ class TradeIntelligenceRAG:
             model=embedding_model,
             api_key=openai_api_key
         )
+        self.embedding_model_name = embedding_model
+        # Embeddings of known questions (CLI examples, alert rule queries) built
+        # ahead of time with --precompute-embeddings, so they are never embedded at runtime
+        self.static_embeddings_path = self.config.get('EMBEDDINGS', 'static_embeddings_path',
+                                                      fallback='data/static_embeddings.npz')
+        self._static_vecs = load_static_embeddings(self.static_embeddings_path, embedding_model)
+        # Monitoring asks the same questions every cycle; their embeddings are
+        # cached per process so only the first ask pays the embeddings round trip
+        self.embed_query = functools.lru_cache(
+            maxsize=self.config.getint('EMBEDDINGS', 'query_cache_size', fallback=1024)
+        )(self._embed_query)
         
         # Initialize LLM for generation
         llm_model = self.config.get('LLM', 'model', fallback='gpt-4o-mini')
@@ -73,6 +193,13 @@ class TradeIntelligenceRAG:
         # Create vector store
         self.vector_store = PineconeVectorStore(pinecone_index=pinecone_index)
         
+        # Chunk text kept out of Pinecone by the ETL is read back from its side store
+        self.text_store = None
+        if not self.config.getboolean('VECTOR_DB', 'store_text_in_metadata', fallback=True):
+            self.text_store = TextStore(
+                self.config.get('VECTOR_DB', 'text_store_path', fallback='data/text_store.db')
+            )
+        
         # Create storage context
         storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
         
@@ -82,17 +209,43 @@ class TradeIntelligenceRAG:
             storage_context=storage_context
         )
         
-        # Create query engine
-        self.query_engine = self._create_query_engine()
+        # Query engines are reused per (top_k, filters); building one is pure overhead
+        self._engine_cache: Dict[Tuple, RetrieverQueryEngine] = {}
+        self.query_engine = self._get_query_engine()
+        
+        # Queries in flight at once for batch execution
+        self.max_concurrency = self.config.getint('LLM', 'max_concurrency', fallback=8)
         
         logger.info("Trade Intelligence RAG system initialized successfully")
     
-    def _create_query_engine(self, top_k: int = 10):
+    def _get_query_engine(self, top_k: int = 10, filters: Optional[Dict] = None) -> RetrieverQueryEngine:
+        """
+        Return the cached query engine for these retrieval settings, building it on first use
+        
+        Args:
+            top_k: Number of relevant documents to retrieve
+            filters: Optional metadata filters
+        
+        Returns:
+            Query engine
+        """
+        key = (top_k, frozenset(filters.items()) if filters else None)
+        engine = self._engine_cache.get(key)
+        if engine is None:
+            engine = self._build_engine(top_k, filters)
+            if len(self._engine_cache) >= self.ENGINE_CACHE_SIZE:
+                # Evict the oldest engine (dicts keep insertion order)
+                self._engine_cache.pop(next(iter(self._engine_cache)), None)
+            self._engine_cache[key] = engine
+        return engine
+    
+    def _build_engine(self, top_k: int, filters: Optional[Dict] = None) -> RetrieverQueryEngine:
         """Create a query engine with custom retriever"""
         # Create retriever
         retriever = VectorIndexRetriever(
             index=self.index,
             similarity_top_k=top_k,
+            filters=filters
         )
         
         # Create query engine with retriever
@@ -100,17 +253,19 @@ class TradeIntelligenceRAG:
             retriever=retriever,
             response_mode=ResponseMode.COMPACT,
             llm=self.llm,
+            node_postprocessors=[SideStoreTextFiller(self.text_store)] if self.text_store else None,
         )
         
         return query_engine
     
-    def query(self, question: str, top_k: int = 10) -> Dict:
+    def query(self, question: str, top_k: int = 10, include_sources: bool = True) -> Dict:
         """
         Query the RAG system with a natural language question
         
         Args:
             question: Natural language question
             top_k: Number of relevant documents to retrieve
+            include_sources: Whether to copy source documents into the result
         
         Returns:
             Dictionary with answer, sources, and metadata
@@ -118,42 +273,164 @@ class TradeIntelligenceRAG:
         try:
             logger.info(f"Processing query: {question}")
             
-            # Recreate query engine with specified top_k
-            query_engine = self._create_query_engine(top_k=top_k)
+            query_engine = self._get_query_engine(top_k=top_k)
             
-            # Execute query
-            response = query_engine.query(question)
+            # Execute query with the (cached) question embedding
+            response = query_engine.query(self._query_bundle(question))
             
-            # Extract source documents
-            sources = []
-            if hasattr(response, 'source_nodes'):
-                for node in response.source_nodes:
-                    sources.append({
-                        'text': node.node.text,
-                        'score': node.score,
-                        'metadata': node.node.metadata
-                    })
+            return self._build_result(question, response, include_sources)
             
-            result = {
-                'question': question,
-                'answer': str(response),
-                'sources': sources,
-                'num_sources': len(sources)
-            }
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}")
+            return self._error_result(question, e)
+    
+    async def aquery(self, question: str, top_k: int = 10, include_sources: bool = True) -> Dict:
+        """
+        Async variant of query(); embedding, retrieval and LLM calls are awaited
+        so several questions can be in flight on one event loop
+        
+        Args:
+            question: Natural language question
+            top_k: Number of relevant documents to retrieve
+            include_sources: Whether to copy source documents into the result
+        
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
+        try:
+            logger.info(f"Processing query: {question}")
             
-            logger.info(f"Query completed with {len(sources)} sources")
-            return result
+            query_bundle, nodes = await self.aretrieve(question, top_k=top_k)
+            return await self.asynthesize(query_bundle, nodes, top_k=top_k, include_sources=include_sources)
             
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
-            return {
-                'question': question,
-                'answer': f"Error processing query: {str(e)}",
-                'sources': [],
-                'num_sources': 0
-            }
+            return self._error_result(question, e)
+    
+    async def aretrieve(self, question: str, top_k: int = 10) -> Tuple[QueryBundle, List[NodeWithScore]]:
+        """
+        Embed a question and retrieve its top documents (first half of aquery)
+        
+        Args:
+            question: Natural language question
+            top_k: Number of relevant documents to retrieve
+        
+        Returns:
+            Tuple of (query bundle with embedding, retrieved nodes)
+        """
+        query_bundle = await asyncio.to_thread(self._query_bundle, question)
+        # The pinned PineconeVectorStore has no native aquery (the base class calls
+        # the blocking query()), so retrieval runs on a worker thread to keep the
+        # event loop free for other in-flight questions
+        nodes = await asyncio.to_thread(self._get_query_engine(top_k=top_k).retrieve, query_bundle)
+        return query_bundle, nodes
+    
+    async def asynthesize(self, query_bundle: QueryBundle, nodes: List[NodeWithScore],
+                          top_k: int = 10, include_sources: bool = True) -> Dict:
+        """
+        Generate the answer for already retrieved documents (second half of aquery)
+        
+        Args:
+            query_bundle: Query bundle returned by aretrieve
+            nodes: Nodes returned by aretrieve
+            top_k: top_k the nodes were retrieved with
+            include_sources: Whether to copy source documents into the result
+        
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
+        response = await self._get_query_engine(top_k=top_k).asynthesize(query_bundle, nodes)
+        return self._build_result(query_bundle.query_str, response, include_sources)
     
-    def query_with_filters(self, question: str, filters: Dict, top_k: int = 10) -> Dict:
+    def _embed_query(self, question: str) -> List[float]:
+        """Question embedding, from the precomputed set when available"""
+        vector = self._static_vecs.get(question)
+        if vector is not None:
+            return vector
+        return self.embed_model.get_query_embedding(question)
+    
+    def precompute_static_embeddings(self, questions: List[str]) -> int:
+        """
+        Embed known questions and save them for later processes to load at init
+        
+        Args:
+            questions: Questions to embed (duplicates are embedded once)
+        
+        Returns:
+            Number of questions saved
+        """
+        questions = list(dict.fromkeys(questions))
+        vectors = [self.embed_model.get_query_embedding(question) for question in questions]
+        save_static_embeddings(self.static_embeddings_path, self.embedding_model_name, questions, vectors)
+        self._static_vecs = dict(zip(questions, vectors))
+        self.embed_query.cache_clear()
+        logger.info(f"Saved {len(questions)} static embeddings to {self.static_embeddings_path}")
+        return len(questions)
+    
+    def _query_bundle(self, question: str) -> QueryBundle:
+        """Query bundle carrying the question's cached embedding, so retrieval skips embedding it"""
+        return QueryBundle(query_str=question, embedding=self.embed_query(question))
+    
+    def synthesize(self, query_bundle: QueryBundle, nodes: List[NodeWithScore],
+                   top_k: int = 10, include_sources: bool = True) -> Dict:
+        """
+        Generate the answer for already retrieved documents (synchronous asynthesize)
+        
+        Args:
+            query_bundle: Query bundle the nodes were retrieved for
+            nodes: Retrieved nodes
+            top_k: top_k the nodes were retrieved with
+            include_sources: Whether to copy source documents into the result
+        
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
+        try:
+            response = self._get_query_engine(top_k=top_k).synthesize(query_bundle, nodes)
+            return self._build_result(query_bundle.query_str, response, include_sources)
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}")
+            return self._error_result(query_bundle.query_str, e)
+    
+    @staticmethod
+    def _build_result(question: str, response, include_sources: bool = True) -> Dict:
+        """Result dictionary for a query engine response"""
+        source_nodes = getattr(response, 'source_nodes', None) or []
+        
+        # Extract source documents (skipped when the caller only wants the answer)
+        sources = []
+        if include_sources:
+            for node in source_nodes:
+                sources.append({
+                    'id': node.node.node_id,
+                    'text': node.node.text,
+                    'score': node.score,
+                    'metadata': node.node.metadata
+                })
+        
+        result = {
+            'question': question,
+            'answer': str(response),
+            'sources': sources,
+            'num_sources': len(source_nodes)
+        }
+        
+        logger.info(f"Query completed with {len(source_nodes)} sources")
+        return result
+    
+    @staticmethod
+    def _error_result(question: str, e: Exception) -> Dict:
+        """Result dictionary for a failed query"""
+        return {
+            'question': question,
+            'answer': f"Error processing query: {str(e)}",
+            'sources': [],
+            'num_sources': 0,
+            'error': str(e)
+        }
+    
+    def query_with_filters(self, question: str, filters: Dict, top_k: int = 10,
+                           include_sources: bool = True) -> Dict:
         """
         Query with metadata filters
         
@@ -161,6 +438,7 @@ class TradeIntelligenceRAG:
             question: Natural language question
             filters: Metadata filters (e.g., {'hs_code': '851712', 'source': 'bill_of_lading'})
             top_k: Number of results
+            include_sources: Whether to copy source documents into the result
         
         Returns:
             Query results
@@ -168,39 +446,11 @@ class TradeIntelligenceRAG:
         try:
             logger.info(f"Processing filtered query: {question} with filters: {filters}")
             
-            # Create custom retriever with filters
-            retriever = VectorIndexRetriever(
-                index=self.index,
-                similarity_top_k=top_k,
-                filters=filters
-            )
-            
-            query_engine = RetrieverQueryEngine.from_args(
-                retriever=retriever,
-                response_mode=ResponseMode.COMPACT,
-                llm=self.llm,
-            )
-            
-            response = query_engine.query(question)
-            
-            sources = []
-            if hasattr(response, 'source_nodes'):
-                for node in response.source_nodes:
-                    sources.append({
-                        'text': node.node.text,
-                        'score': node.score,
-                        'metadata': node.node.metadata
-                    })
-            
-            result = {
-                'question': question,
-                'filters': filters,
-                'answer': str(response),
-                'sources': sources,
-                'num_sources': len(sources)
-            }
+            query_engine = self._get_query_engine(top_k=top_k, filters=filters)
+            response = query_engine.query(self._query_bundle(question))
             
-            logger.info(f"Filtered query completed with {len(sources)} sources")
+            result = self._build_result(question, response, include_sources)
+            result['filters'] = filters
             return result
             
         except Exception as e:
@@ -210,7 +460,8 @@ class TradeIntelligenceRAG:
                 'filters': filters,
                 'answer': f"Error: {str(e)}",
                 'sources': [],
-                'num_sources': 0
+                'num_sources': 0,
+                'error': str(e)
             }
     
     def ask_complex_question(self, question: str) -> str:
@@ -223,7 +474,7 @@ class TradeIntelligenceRAG:
         Returns:
             Text answer
         """
-        result = self.query(question)
+        result = self.query(question, include_sources=False)
         return result['answer']
 
 class InteractiveCLI:
@@ -287,15 +538,7 @@ class InteractiveCLI:
     
     def _show_examples(self):
         """Display example questions"""
-        examples = [
-            "Who are the top 3 new buyers for HS code 851712 in the last month?",
-            "Show me all shipments from 'Supplier Inc.' to any buyers in Germany.",
-            "What is the average monthly import value for HS code 950300?",
-            "List all new suppliers that shipped to 'MyCompetitor LLC' in the last week.",
-            "Which countries imported the most electronics (HS 8517) last month?",
-            "Show me recent shipments of medical devices from China to the USA.",
-            "What is the trend in import volumes for HS code 851712 over the last 3 months?",
-        ]
+        examples = EXAMPLE_QUESTIONS
         
         print("\n" + "=" * 80)
         print("📝 Example Questions:")
@@ -337,7 +580,43 @@ class ProgrammaticQueryInterface:
         Returns:
             Query result dictionary
         """
-        result = self.rag.query(question)
+        result = self.rag.query(question, include_sources=return_sources)
+        
+        if not return_sources:
+            # Remove sources to reduce payload
+            result.pop('sources', None)
+        
+        return result
+    
+    def retrieve(self, question: str, top_k: int = 10) -> Tuple[QueryBundle, List[NodeWithScore]]:
+        """
+        Embed a question and retrieve its top documents without calling the LLM
+        
+        Args:
+            question: Natural language question
+            top_k: Number of relevant documents to retrieve
+        
+        Returns:
+            Tuple of (query bundle with embedding, retrieved nodes)
+        """
+        query_bundle = self.rag._query_bundle(question)
+        return query_bundle, self.rag._get_query_engine(top_k=top_k).retrieve(query_bundle)
+    
+    def execute_retrieved(self, query_bundle: QueryBundle, nodes: List[NodeWithScore],
+                          return_sources: bool = False, top_k: int = 10) -> Dict:
+        """
+        Answer a question from documents already fetched by retrieve(), without retrieving again
+        
+        Args:
+            query_bundle: Query bundle returned by retrieve
+            nodes: Nodes returned by retrieve
+            return_sources: Whether to include source documents
+            top_k: top_k the nodes were retrieved with
+        
+        Returns:
+            Query result dictionary
+        """
+        result = self.rag.synthesize(query_bundle, nodes, top_k=top_k, include_sources=return_sources)
         
         if not return_sources:
             # Remove sources to reduce payload
@@ -347,20 +626,48 @@ class ProgrammaticQueryInterface:
     
     def execute_batch_queries(self, questions: List[str]) -> List[Dict]:
         """
-        Execute multiple queries
+        Execute multiple queries concurrently
         
         Args:
             questions: List of questions
         
         Returns:
-            List of results
+            List of results, in question order
         """
-        results = []
-        for question in questions:
-            result = self.execute_query(question)
-            results.append(result)
+        return asyncio.run(self.execute_batch_queries_async(questions))
+    
+    async def execute_batch_queries_async(self, questions: List[str],
+                                          concurrency: Optional[int] = None) -> List[Dict]:
+        """
+        Execute multiple queries with several in flight at once
+        
+        Args:
+            questions: List of questions
+            concurrency: Max concurrent queries (defaults to the configured max_concurrency)
+        
+        Returns:
+            List of results without sources, in question order
+        """
+        concurrency = concurrency or self.rag.max_concurrency
+        # Retrieval and LLM synthesis get separate slots, so questions waiting
+        # for the LLM already have their documents fetched when a slot frees up
+        retrieval_slots = asyncio.Semaphore(concurrency)
+        synthesis_slots = asyncio.Semaphore(concurrency)
         
-        return results
+        async def run_one(question: str) -> Dict:
+            try:
+                logger.info(f"Processing query: {question}")
+                async with retrieval_slots:
+                    query_bundle, nodes = await self.rag.aretrieve(question)
+                async with synthesis_slots:
+                    result = await self.rag.asynthesize(query_bundle, nodes, include_sources=False)
+            except Exception as e:
+                logger.error(f"Error processing query: {str(e)}")
+                result = self.rag._error_result(question, e)
+            result.pop('sources', None)
+            return result
+        
+        return await asyncio.gather(*(run_one(question) for question in questions))
     
     def check_condition(self, question: str, keywords: List[str] = None) -> bool:
         """
@@ -374,27 +681,23 @@ class ProgrammaticQueryInterface:
             True if condition met, False otherwise
         """
         result = self.execute_query(question)
-        answer = result['answer'].lower()
+        answer = result['answer']
         
         # If no keywords specified, check if answer indicates "yes" or contains data
         if not keywords:
-            positive_indicators = ['yes', 'found', 'detected', 'identified', 'new', 'increased']
-            negative_indicators = ['no', 'none', 'not found', 'no data', 'no records']
-            
             # Check for positive indicators
-            for indicator in positive_indicators:
-                if indicator in answer:
-                    return True
+            if _POSITIVE_PATTERN.search(answer):
+                return True
             
             # Check if answer is substantial (not just "no data")
-            if any(neg in answer for neg in negative_indicators):
+            if _NEGATIVE_PATTERN.search(answer):
                 return False
             
             # If answer is substantial (>100 chars), consider it positive
             return len(answer) > 100
         
         # Check for specific keywords
-        return any(keyword.lower() in answer for keyword in keywords)
+        return _compile_phrases(tuple(keywords)).search(answer) is not None
 
 def main():
     """Main entry point"""
@@ -404,6 +707,17 @@ def main():
         # Run interactive CLI
         cli = InteractiveCLI()
         cli.run()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--precompute-embeddings':
+        # Build step: embed the CLI examples and the monitoring rule queries
+        rules_file = sys.argv[2] if len(sys.argv) > 2 else 'alert_rules.json'
+        questions = list(EXAMPLE_QUESTIONS)
+        if os.path.exists(rules_file):
+            with open(rules_file, 'r') as f:
+                questions.extend(rule['query'] for rule in json.load(f))
+        
+        rag = TradeIntelligenceRAG()
+        count = rag.precompute_static_embeddings(questions)
+        print(f"Saved {count} question embeddings to {rag.static_embeddings_path}")
     else:
         # Example programmatic usage
         print("Starting Trade Intelligence RAG Query Interface\n")